@@ -0,0 +1,93 @@
+"""
+Cold import time of the API entry point, measured with ``python -X importtime``.
+
+    python -m benchmarks.bench_import_time
+    python -m benchmarks.bench_import_time --module main --budget-ms 1500 --top 15
+
+Each run imports the module in a fresh interpreter and keeps the best of
+``--runs``. Exits non-zero if the import exceeds ``--budget-ms`` or pulls in
+any module that should only load on first use (the browser, TTS, PDF and
+AWS SDK stacks).
+"""
+import argparse
+import os
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Must not be imported just by importing the app
+LAZY_MODULES = (
+    "undetected_chromedriver",
+    "selenium",
+    "podcastfy",
+    "pydub",
+    "fpdf",
+    "PIL",
+    "aioboto3",
+    "botocore",
+    "uvicorn",
+    "langsmith",
+)
+
+
+def import_profile(module: str) -> Dict[str, Tuple[int, int]]:
+    """Return {module: (self_us, cumulative_us)} from one ``-X importtime`` run."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        tail = "\n".join(result.stderr.splitlines()[-5:])
+        raise SystemExit(f"import {module} failed:\n{tail}")
+
+    profile: Dict[str, Tuple[int, int]] = {}
+    for line in result.stderr.splitlines():
+        # "import time:   self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3:
+            continue
+        name = fields[2].strip()
+        profile[name] = (int(fields[0]), int(fields[1]))
+    return profile
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--budget-ms", type=float, default=1500.0)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    runs = [import_profile(args.module) for _ in range(args.runs)]
+    profile = min(runs, key=lambda p: p.get(args.module, (0, 0))[1])
+    total_ms = profile[args.module][1] / 1000
+
+    print(f"import {args.module}: {total_ms:,.0f} ms (best of {args.runs}, budget {args.budget_ms:,.0f} ms)")
+    print("heaviest top-level packages:")
+    top_level: List[Tuple[int, str]] = sorted(
+        ((cumulative, name) for name, (_, cumulative) in profile.items() if "." not in name),
+        reverse=True,
+    )
+    for cumulative, name in top_level[: args.top]:
+        print(f"  {cumulative / 1000:>8,.1f} ms  {name}")
+
+    failures = []
+    eager = sorted({name.split(".")[0] for name in profile} & set(LAZY_MODULES))
+    if eager:
+        failures.append(f"imported eagerly: {', '.join(eager)}")
+    if total_ms > args.budget_ms:
+        failures.append(f"over budget by {total_ms - args.budget_ms:,.0f} ms")
+    for failure in failures:
+        print(f"FAIL {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
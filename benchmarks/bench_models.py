@@ -0,0 +1,70 @@
+"""
+Items/sec for the feed item model layer: parse, dump and rehydrate.
+
+    python -m benchmarks.bench_models --items 5000
+"""
+import argparse
+import os
+import sys
+import time
+import uuid
+from typing import Any, Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.perplexity import FeedItemRecord, PerplexityFeedItem
+
+
+def make_feed_json(n: int) -> List[Dict[str, Any]]:
+    return [
+        {
+            "uuid": uuid.uuid4().hex,
+            "slug": f"story-{i}",
+            "title": f"Story number {i} about something newsworthy",
+            "summary": "A short summary. " * 8,
+            "first_answer": "The first answer paragraph. " * 10,
+            "description": "Description text. " * 6,
+            "bullet_summary_preload": "• Key point one — with detail.\n" * 6,
+            "featured_images": [{"image": f"https://example.com/{i}/{j}.jpg"} for j in range(3)],
+            "last_query_datetime": "2025-07-20T12:00:00",
+        }
+        for i in range(n)
+    ]
+
+
+def rate(label: str, n: int, fn: Callable[[], Any], repeat: int = 3) -> None:
+    best = min(_timed(fn) for _ in range(repeat))
+    print(f"{label:<36} {n / best:>12,.0f} items/sec")
+
+
+def _timed(fn: Callable[[], Any]) -> float:
+    started = time.perf_counter()
+    fn()
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=5000)
+    args = parser.parse_args()
+    n = args.items
+
+    feed = make_feed_json(n)
+    models = PerplexityFeedItem.from_json_page(feed)
+    rows = PerplexityFeedItem.dump_many(models)
+    for row in rows:
+        row["s3_url"] = ""  # rows read back from the table carry extra attributes
+
+    print("parse")
+    rate("  from_json per item", n, lambda: [PerplexityFeedItem.from_json(i) for i in feed])
+    rate("  from_json_page (TypeAdapter)", n, lambda: PerplexityFeedItem.from_json_page(feed))
+    print("dump")
+    rate("  model_dump per item", n, lambda: [m.model_dump() for m in models])
+    rate("  dump_many (TypeAdapter)", n, lambda: PerplexityFeedItem.dump_many(models))
+    print("rehydrate")
+    rate("  PerplexityFeedItem(**row)", n, lambda: [PerplexityFeedItem(**r) for r in rows])
+    rate("  FeedItemRecord.from_row (slots)", n, lambda: [FeedItemRecord.from_row(r) for r in rows])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,342 @@
+"""
+End-to-end throughput of the API: feed ingestion and podcast generation.
+
+The real app and ``ServicesContainer`` run in-process against local
+stand-ins: moto for DynamoDB and S3, a Perplexity client replaying recorded
+feed JSON, and a podcastfy client that sleeps for the configured LLM/TTS
+delays and writes a silent MP3. Nothing touches a live service.
+
+    pip install "moto[server]"
+    python -m benchmarks.bench_pipeline --feed-calls 10 --transcript-ms 200 --tts-ms 500
+    python -m benchmarks.bench_pipeline --feed recorded_feed.json --output before.json
+
+Prints a JSON report (items/sec, endpoint and per-stage p50/p99, peak RSS)
+tagged with the current commit, so two runs can be compared directly.
+Settings the app reads from the environment (PODCAST_*_CONCURRENCY,
+TTS_CONCURRENCY, PODCAST_SOURCE_MODE, ...) apply as usual; the TTS rate
+limit and the caches default to off so the pipeline itself is measured.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Set
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from moto.server import ThreadedMotoServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# One silent MPEG-1 Layer III frame (128 kbps, 44.1 kHz), ~26 ms of audio
+SILENT_FRAME = b"\xff\xfb\x90\x64" + b"\x00" * 413
+
+
+def make_feed_json(n: int) -> List[Dict[str, Any]]:
+    return [
+        {
+            "uuid": uuid.uuid4().hex,
+            "slug": f"story-{i}",
+            "title": f"Story number {i} about something newsworthy",
+            "summary": "A short summary. " * 8,
+            "first_answer": "The first answer paragraph. " * 10,
+            "description": "Description text. " * 6,
+            "bullet_summary_preload": "• Key point one — with detail.\n" * 6,
+            "featured_images": [],
+            "last_query_datetime": "2025-07-20T12:00:00",
+        }
+        for i in range(n)
+    ]
+
+
+def load_feed_json(path: Optional[str]) -> List[Dict[str, Any]]:
+    """Recorded feed items from a saved ``get_feed`` response (or a bare list of items)."""
+    if not path:
+        return make_feed_json(50)
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    return data.get("items", []) if isinstance(data, dict) else data
+
+
+def percentiles(samples: List[float]) -> Dict[str, Any]:
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+
+    def rank(p: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))], 4)
+
+    return {"count": len(ordered), "p50": rank(0.50), "p99": rank(0.99), "max": round(ordered[-1], 4)}
+
+
+def peak_rss_mb() -> Dict[str, float]:
+    # ru_maxrss is in KiB on Linux; "self" includes the in-process moto server
+    return {
+        "self": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "children": round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024, 1),
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# ----------------------------------------------------------------------
+# Stand-ins
+# ----------------------------------------------------------------------
+class RecordedPerplexityClient:
+    """
+    Serves recorded feed items as an endless feed.
+
+    Every call hands out the next items with fresh uuids, the way new
+    stories keep arriving, so each ``/get-and-save-feed`` saves a full page.
+    """
+
+    def __init__(self, templates: List[Dict[str, Any]], latency: float) -> None:
+        self.templates = templates
+        self.latency = latency
+        self._served = 0
+
+    async def get_feed(self, limit: int = 100, offset: int = 0, version: str = "2.18",
+                       topic: str = "top", source: str = "default") -> Dict[str, Any]:
+        await asyncio.sleep(self.latency)
+        items = []
+        for _ in range(limit):
+            template = self.templates[self._served % len(self.templates)]
+            self._served += 1
+            items.append({**template, "uuid": uuid.uuid4().hex})
+        return {"items": items}
+
+    async def get_feed_items(self, limit: int = 100, offset: int = 0, version: str = "2.18",
+                             topic: str = "top", source: str = "default", pages: int = 1) -> List[Any]:
+        from models.perplexity import PerplexityFeedItem
+
+        feed_json = await self.get_feed(limit * max(pages, 1), offset, version, topic, source)
+        return PerplexityFeedItem.from_json_page(feed_json["items"])
+
+
+class FakePodcastClient:
+    """podcastfy stand-in: waits out the configured latencies and writes placeholder output."""
+
+    def __init__(self, transcript_seconds: float, tts_seconds: float, jitter: float, audio_bytes: int,
+                 failure_rate: float = 0.0) -> None:
+        self.transcript_seconds = transcript_seconds
+        self.tts_seconds = tts_seconds
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.audio = SILENT_FRAME * max(1, audio_bytes // len(SILENT_FRAME))
+
+    async def generate_transcript(self, config: Any) -> str:
+        await self._wait(self.transcript_seconds)
+        return await asyncio.to_thread(
+            self._write, config.output_dir, "transcripts", ".txt",
+            b"<Person1>Hello.</Person1><Person2>Hi.</Person2>\n" * 50,
+        )
+
+    async def synthesize(self, config: Any, transcript_file: str) -> str:
+        await self._wait(self.tts_seconds)
+        if random.random() < self.failure_rate:
+            raise RuntimeError("simulated TTS failure")
+        return await asyncio.to_thread(self._write, config.output_dir, "audio", ".mp3", self.audio)
+
+    async def _wait(self, seconds: float) -> None:
+        await asyncio.sleep(seconds * random.uniform(1 - self.jitter, 1 + self.jitter))
+
+    @staticmethod
+    def _write(output_dir: Optional[str], kind: str, suffix: str, data: bytes) -> str:
+        directory = os.path.join(output_dir or tempfile.gettempdir(), kind)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{uuid.uuid4().hex}{suffix}")
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+
+# ----------------------------------------------------------------------
+# Phases
+# ----------------------------------------------------------------------
+async def timed_post(http: Any, path: str, latencies: List[float]) -> Dict[str, Any]:
+    started = time.perf_counter()
+    response = await http.post(path)
+    latencies.append(time.perf_counter() - started)
+    response.raise_for_status()
+    return response.json()
+
+
+async def get_job(http: Any, job_id: str) -> Dict[str, Any]:
+    response = await http.get(f"/jobs/{job_id}")
+    response.raise_for_status()
+    return response.json()
+
+
+async def ingest(http: Any, calls: int, concurrency: int) -> Dict[str, Any]:
+    """Fire ``calls`` ``/get-and-save-feed`` requests, ``concurrency`` at a time."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+
+    async def one() -> int:
+        async with semaphore:
+            return (await timed_post(http, "/get-and-save-feed", latencies))["num_items_saved"]
+
+    started = time.perf_counter()
+    saved = sum(await asyncio.gather(*(one() for _ in range(calls))))
+    elapsed = time.perf_counter() - started
+    return {
+        "requests": calls,
+        "items_saved": saved,
+        "seconds": round(elapsed, 3),
+        "items_per_sec": round(saved / elapsed, 1) if elapsed else None,
+        "request_seconds": percentiles(latencies),
+    }
+
+
+async def generate(http: Any, app_module: Any, poll: float) -> Dict[str, Any]:
+    """
+    Call ``/generate-podcast`` until it stops finding new items, then wait for every item.
+
+    Pending items that are already running are skipped, so
+    a call that queues nothing while items are in flight just means the
+    pipeline is full; the next call after some finish picks up the rest.
+    Failed items stay pending and come round again once their retry
+    backoff passes, so once a call queues nothing but retries and nothing
+    else is running, the run ends instead of waiting on them.
+    """
+    latencies: List[float] = []
+    tasks: List[Dict[str, Any]] = []
+    job_ids: List[str] = []
+    attempted: Set[str] = set()
+    started = time.perf_counter()
+    while True:
+        response = await timed_post(http, "/generate-podcast", latencies)
+        if not response["message"].startswith("Podcast generation queued for 0 "):
+            job_ids.append(response["job_id"])
+            queued = {task["uuid"] for task in (await get_job(http, response["job_id"]))["items"]}
+            if queued - attempted:
+                attempted |= queued
+                continue
+            if app_module.podcast_service.in_flight() <= len(queued):
+                # Nothing but retries left: let them finish and stop
+                await app_module.podcast_service.drain()
+                break
+        elif not app_module.podcast_service.in_flight():
+            break
+        await asyncio.sleep(poll)
+    elapsed = time.perf_counter() - started
+
+    for job_id in job_ids:
+        tasks.extend((await get_job(http, job_id))["items"])
+
+    statuses: Dict[str, int] = {}
+    stages: Dict[str, List[float]] = {}
+    for task in tasks:
+        statuses[task["status"]] = statuses.get(task["status"], 0) + 1
+        for stage, seconds in task["timings"].items():
+            stages.setdefault(stage, []).append(seconds)
+    done = statuses.get("succeeded", 0)
+    return {
+        "jobs": len(job_ids),
+        "items": len(tasks),
+        # Failed items queued again by a later call
+        "retried": len(tasks) - len({task["uuid"] for task in tasks}),
+        "statuses": statuses,
+        "seconds": round(elapsed, 3),
+        "items_per_sec": round(done / elapsed, 2) if elapsed else None,
+        "request_seconds": percentiles(latencies),
+        "stage_seconds": {stage: percentiles(samples) for stage, samples in sorted(stages.items())},
+    }
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    import httpx
+    from dependency_injector import providers
+
+    import main as app_module
+    from utils.dynamodb_migrations import create_state_table, create_table
+
+    container = app_module.container
+    container.perplexity_client.override(providers.Object(
+        RecordedPerplexityClient(load_feed_json(args.feed), args.feed_ms / 1000)
+    ))
+    container.podcast_client.override(providers.Object(
+        FakePodcastClient(args.transcript_ms / 1000, args.tts_ms / 1000, args.jitter, args.audio_kb * 1024,
+                          args.failure_rate)
+    ))
+
+    dynamodb = await container.dynamodb_client()
+    await create_table(dynamodb)
+    await create_state_table(dynamodb)
+    s3 = await container.s3_client()
+    await (await s3.client("s3")).create_bucket(Bucket="reyy-ai")
+
+    report: Dict[str, Any] = {"commit": git_commit(), "config": vars(args)}
+    transport = httpx.ASGITransport(app=app_module.app)
+    async with app_module.lifespan(app_module.app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as http:
+            report["ingest"] = await ingest(http, args.feed_calls, args.concurrency)
+            report["generate"] = await generate(http, app_module, args.poll_ms / 1000)
+    report["peak_rss_mb"] = peak_rss_mb()
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--feed", help="recorded feed JSON ({'items': [...]} or a list); synthetic if omitted")
+    parser.add_argument("--feed-calls", type=int, default=10, help="/get-and-save-feed requests (20 items each)")
+    parser.add_argument("--concurrency", type=int, default=4, help="concurrent /get-and-save-feed requests")
+    parser.add_argument("--poll-ms", type=float, default=50, help="wait between /generate-podcast calls while the pipeline is full")
+    parser.add_argument("--feed-ms", type=float, default=50, help="simulated Perplexity latency per page")
+    parser.add_argument("--transcript-ms", type=float, default=200, help="simulated LLM latency per item")
+    parser.add_argument("--tts-ms", type=float, default=500, help="simulated TTS latency per item")
+    parser.add_argument("--jitter", type=float, default=0.2, help="relative spread of the simulated latencies")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="fraction of TTS calls that fail")
+    parser.add_argument("--audio-kb", type=int, default=512, help="size of each synthetic MP3")
+    parser.add_argument("--port", type=int, default=5058)
+    parser.add_argument("--output", help="also write the report to this file")
+    args = parser.parse_args()
+
+    scratch = tempfile.mkdtemp(prefix="reyy-bench-")
+    server = ThreadedMotoServer(port=args.port, verbose=False)
+    server.start()
+    os.environ.update({
+        "AWS_ENDPOINT_URL": f"http://127.0.0.1:{args.port}",
+        "AWS_ACCESS_KEY_ID": "testing",
+        "AWS_SECRET_ACCESS_KEY": "testing",
+        "AWS_REGION": "us-east-1",
+        "DYNAMODB_TABLE_NAME": "reyy-ai-bench",
+        "JOB_STORE_PATH": os.path.join(scratch, "jobs.sqlite3"),
+        "WORKSPACE_ROOT": os.path.join(scratch, "workspaces"),
+        "PODCAST_RESUME_ON_STARTUP": "false",
+        "INGEST_ENABLED": "false",
+    })
+    for name, value in {
+        "TTS_RPM": "1000000",
+        "PODCAST_CACHE_ENABLED": "false",
+        "IMAGE_CACHE_ENABLED": "false",
+    }.items():
+        os.environ.setdefault(name, value)
+
+    try:
+        report = asyncio.run(run(args))
+    finally:
+        server.stop()
+    output = json.dumps(report, indent=2, default=str)
+    print(output)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
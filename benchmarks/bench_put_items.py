@@ -0,0 +1,127 @@
+"""
+Round trips per ``DynamoDBClient.put_items`` call, legacy path vs batched path.
+
+Runs against a local moto server so it never touches AWS:
+
+    pip install "moto[server]"
+    python -m benchmarks.bench_put_items --items 100
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+import uuid
+from collections import Counter
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from moto.server import ThreadedMotoServer
+
+TABLE_NAME = "reyy-ai-bench"
+
+
+def make_items(n: int) -> List[Dict[str, Any]]:
+    return [
+        {
+            "uuid": uuid.uuid4().hex,
+            "slug": f"slug-{i}",
+            "title": f"Title {i}",
+            "summary": "summary",
+            "first_answer": "answer",
+            "description": "description",
+            "bullet_summary_preload": "- one\n- two\n- three",
+            "images": [],
+        }
+        for i in range(n)
+    ]
+
+
+async def legacy_put_items(client: Any, items: List[Dict[str, Any]]) -> int:
+    """The pre-batching implementation: one get_item and one put_item per item."""
+    async with client.session.resource("dynamodb") as dynamodb:
+        table = await dynamodb.Table(client.table_name)
+        new_items = []
+        for item in items:
+            if not await client.get_item({"uuid": item["uuid"]}):
+                new_items.append(item)
+        for item in new_items:
+            await table.put_item(Item=item)
+        return len(new_items)
+
+
+async def create_table(client: Any) -> None:
+    async with client.session.client("dynamodb") as ddb:
+        await ddb.create_table(
+            TableName=TABLE_NAME,
+            KeySchema=[{"AttributeName": "uuid", "KeyType": "HASH"}],
+            AttributeDefinitions=[{"AttributeName": "uuid", "AttributeType": "S"}],
+            BillingMode="PAY_PER_REQUEST",
+        )
+
+
+async def measure(client: Any, calls: Counter, label: str, put, items: List[Dict[str, Any]]) -> Dict[str, Any]:
+    calls.clear()
+    started = time.perf_counter()
+    saved = await put(items)
+    elapsed = time.perf_counter() - started
+    return {
+        "path": label,
+        "saved": saved,
+        "round_trips": sum(calls.values()),
+        "by_operation": dict(calls),
+        "seconds": round(elapsed, 4),
+    }
+
+
+async def run(n: int) -> None:
+    from clients.dynamodb_client import DynamoDBClient
+
+    client = DynamoDBClient()
+    client.table_name = TABLE_NAME
+
+    calls: Counter = Counter()
+
+    def count(event_name: str, **_: Any) -> None:
+        calls[event_name.rsplit(".", 1)[-1]] += 1
+
+    client.session.events.register("before-send.dynamodb", count)
+    await create_table(client)
+
+    # Half of every second run already exists so the dedup path does real work.
+    legacy_items, batched_items = make_items(n), make_items(n)
+    await client.put_items(legacy_items[: n // 2])
+    await client.put_items(batched_items[: n // 2])
+
+    results = [
+        await measure(client, calls, "legacy", lambda i: legacy_put_items(client, i), legacy_items),
+        await measure(client, calls, "batched", client.put_items, batched_items),
+    ]
+    for result in results:
+        print(result)
+    await client.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=100)
+    parser.add_argument("--port", type=int, default=5055)
+    args = parser.parse_args()
+
+    server = ThreadedMotoServer(port=args.port, verbose=False)
+    server.start()
+    os.environ.update({
+        "AWS_ENDPOINT_URL": f"http://127.0.0.1:{args.port}",
+        "AWS_ACCESS_KEY_ID": "testing",
+        "AWS_SECRET_ACCESS_KEY": "testing",
+        "AWS_REGION": "us-east-1",
+    })
+    try:
+        asyncio.run(run(args.items))
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Throughput of utils.text.normalize_text against the old chained-replace clean_text.
+
+    python -m benchmarks.bench_text_normalize
+
+The encoding guarantees are covered by tests/test_text.py.
+"""
+import argparse
+import os
+import sys
+import time
+from typing import Callable
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.text import normalize_text
+
+# Shaped like a real ``bullet_summary_preload``: markdown bullets, curly
+# quotes, dashes and the odd non-Latin name.
+SAMPLE = (
+    "- **Markets rally** — the S&P 500 rose 1.2% after the Fed’s “wait-and-see” remarks.\n"
+    "- Treasury yields slipped to 4.1%–4.2%, while the dollar weakened against the yen (¥).\n"
+    "- Analysts at Société Générale called it ‘a relief rally’… not a trend change.\n"
+    "- Tokyo’s Nikkei (日経平均) closed up; Zürich and Kraków (Polska) followed.\n"
+    "- • Oil fell below $80 − Brent at $79.40 — on demand worries.\n"
+) * 4
+
+
+def legacy_clean_text(text: str) -> str:
+    return (text.replace('\u2014', '-')
+                .replace('\u2013', '-')
+                .replace('\u2018', "'")
+                .replace('\u2019', "'")
+                .replace('\u201c', '"')
+                .replace('\u201d', '"'))
+
+
+def bench(label: str, fn: Callable[[str], str], iterations: int) -> None:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn(SAMPLE)
+    elapsed = time.perf_counter() - started
+    mb = len(SAMPLE) * iterations / 1e6
+    print(f"{label:<34} {iterations / elapsed:>10,.0f} docs/sec  {mb / elapsed:>7.1f} Mchars/sec")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    bench("legacy clean_text (6 replaces)", legacy_clean_text, args.iterations)
+    bench("normalize_text", normalize_text, args.iterations)
+    bench("normalize_text(encoding=latin-1)", lambda t: normalize_text(t, encoding="latin-1"), args.iterations)
+
+
+if __name__ == "__main__":
+    main()
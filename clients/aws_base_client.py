@@ -1,10 +1,32 @@
+import asyncio
 import os
-import aioboto3
-from typing import Optional
+from contextlib import AsyncExitStack
+from typing import Any, AsyncIterator, Dict, Optional, Tuple, Type, TypeVar
+
+from utils.metrics import instrument_botocore
+
+T = TypeVar("T", bound="AWSBaseClient")
 
 
 class AWSBaseClient:
+    """
+    Owns long-lived aioboto3 clients/resources for the lifetime of the process.
+
+    Each botocore client carries its own endpoint resolver and HTTP connection
+    pool, so they are opened once (on startup, or lazily on first use) and
+    shared by every call instead of being rebuilt per operation.
+    """
+
+    # Services to open eagerly in ``open()``; subclasses fill these in.
+    resources: Tuple[str, ...] = ()
+    clients: Tuple[str, ...] = ()
+
     def __init__(self) -> None:
+        # Imported here, not at module level: botocore's service models are a
+        # large share of startup time and only matter once a client is built
+        import aioboto3
+        from aiobotocore.config import AioConfig
+
         self.aws_access_key_id: Optional[str] = os.environ.get('AWS_ACCESS_KEY_ID')
         self.aws_secret_access_key: Optional[str] = os.environ.get('AWS_SECRET_ACCESS_KEY')
         self.region_name: str = os.environ.get('AWS_REGION', 'us-east-1')
@@ -12,4 +34,74 @@ class AWSBaseClient:
             aws_access_key_id=self.aws_access_key_id,
             aws_secret_access_key=self.aws_secret_access_key,
             region_name=self.region_name
-        )
\ No newline at end of file
+        )
+        self.config = AioConfig(
+            max_pool_connections=int(os.environ.get('AWS_MAX_POOL_CONNECTIONS', '50')),
+            connect_timeout=float(os.environ.get('AWS_CONNECT_TIMEOUT', '5')),
+            read_timeout=float(os.environ.get('AWS_READ_TIMEOUT', '30')),
+            tcp_keepalive=os.environ.get('AWS_TCP_KEEPALIVE', 'true').lower() == 'true',
+            retries={'max_attempts': int(os.environ.get('AWS_MAX_ATTEMPTS', '5')), 'mode': 'adaptive'},
+            connector_args={'keepalive_timeout': float(os.environ.get('AWS_KEEPALIVE_TIMEOUT', '60'))},
+        )
+        self._exit_stack: Optional[AsyncExitStack] = None
+        self._open_clients: Dict[str, Any] = {}
+        self._open_resources: Dict[str, Any] = {}
+        self._lock = asyncio.Lock()
+
+    async def open(self) -> None:
+        """Open every declared client/resource up front so the first request is warm."""
+        for name in self.resources:
+            await self.resource(name)
+        for name in self.clients:
+            await self.client(name)
+
+    async def close(self) -> None:
+        """Close all pooled clients/resources and their connection pools."""
+        async with self._lock:
+            if self._exit_stack is not None:
+                await self._exit_stack.aclose()
+            self._exit_stack = None
+            self._open_clients.clear()
+            self._open_resources.clear()
+
+    async def client(self, service_name: str) -> Any:
+        """Return the shared low-level client for ``service_name``, opening it on first use."""
+        if service_name not in self._open_clients:
+            async with self._lock:
+                if service_name not in self._open_clients:
+                    stack = await self._stack()
+                    client = await stack.enter_async_context(
+                        self.session.client(service_name, config=self.config)
+                    )
+                    instrument_botocore(client, service_name)
+                    self._open_clients[service_name] = client
+        return self._open_clients[service_name]
+
+    async def resource(self, service_name: str) -> Any:
+        """Return the shared service resource for ``service_name``, opening it on first use."""
+        if service_name not in self._open_resources:
+            async with self._lock:
+                if service_name not in self._open_resources:
+                    stack = await self._stack()
+                    resource = await stack.enter_async_context(
+                        self.session.resource(service_name, config=self.config)
+                    )
+                    instrument_botocore(resource.meta.client, service_name)
+                    self._open_resources[service_name] = resource
+        return self._open_resources[service_name]
+
+    async def _stack(self) -> AsyncExitStack:
+        if self._exit_stack is None:
+            self._exit_stack = AsyncExitStack()
+            await self._exit_stack.__aenter__()
+        return self._exit_stack
+
+    @classmethod
+    async def lifecycle(cls: Type[T]) -> AsyncIterator[T]:
+        """Async generator for ``providers.Resource``: open on init, close on shutdown."""
+        client = cls()
+        await client.open()
+        try:
+            yield client
+        finally:
+            await client.close()
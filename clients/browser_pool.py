@@ -0,0 +1,157 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, TypeVar
+
+R = TypeVar("R")
+
+
+class PooledDriver:
+    """A live WebDriver plus the bookkeeping needed to decide when to recycle it."""
+
+    def __init__(self, driver: Any) -> None:
+        self.driver = driver
+        self.created_at = time.monotonic()
+        self.uses = 0
+
+
+class BrowserPool:
+    """
+    Bounded pool of warm browser instances.
+
+    Drivers are launched on demand up to ``size``, loaded once with ``warm_url``
+    so the Cloudflare clearance is in place, and handed back to the pool after
+    each fetch. A driver is recycled after ``max_uses`` borrows, once it is
+    older than ``max_age_seconds``, or when it fails a health check. Every
+    blocking Selenium call runs on the pool's own thread pool, never the event
+    loop's default executor.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], Any],
+        warm_url: str,
+        size: int = 2,
+        max_uses: int = 50,
+        max_age_seconds: float = 1800,
+    ) -> None:
+        self.factory = factory
+        self.warm_url = warm_url
+        self.size = size
+        self.max_uses = max_uses
+        self.max_age_seconds = max_age_seconds
+        self._executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix="browser-pool")
+        self._slots = asyncio.Semaphore(size)
+        self._idle: List[PooledDriver] = []
+        self._cookies: List[Dict[str, Any]] = []
+        self._closed = False
+        self._executor_closed = False
+
+    async def run(self, fn: Callable[..., R], *args: Any) -> R:
+        """Run a blocking browser call on the pool's dedicated threads."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, fn, *args)
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[PooledDriver]:
+        """Borrow a healthy, warmed-up driver; it is returned (or recycled) on exit."""
+        if self._closed:
+            raise RuntimeError("BrowserPool is closed")
+        async with self._slots:
+            pooled = self._idle.pop() if self._idle else None
+            if pooled is not None and not await self.run(self._is_healthy, pooled):
+                await self.run(self._quit, pooled)
+                pooled = None
+            if pooled is None:
+                pooled = await self.run(self._launch)
+
+            try:
+                yield pooled
+            except BaseException:
+                # Browser state is unknown after a failed fetch; don't reuse it.
+                await self._release_quit(pooled)
+                raise
+
+            pooled.uses += 1
+            if self._closed or self._expired(pooled):
+                await self._release_quit(pooled)
+            else:
+                self._idle.append(pooled)
+
+    async def refresh_cookies(self, pooled: PooledDriver) -> List[Dict[str, Any]]:
+        """Re-read cookies from ``pooled`` so newly launched drivers share its clearance."""
+        self._cookies = await self.run(pooled.driver.get_cookies)
+        return self._cookies
+
+    async def close(self, timeout: Optional[float] = 30) -> None:
+        """
+        Quit every driver and stop the pool's threads.
+
+        Waits up to ``timeout`` seconds for borrowed drivers to come back
+        (they are quit on release once the pool is closed); any still out
+        after that are quit on a plain thread when their borrower lets go.
+        """
+        self._closed = True
+        idle, self._idle = self._idle, []
+        for pooled in idle:
+            await self.run(self._quit, pooled)
+
+        async def wait_for_borrowed() -> None:
+            for _ in range(self.size):
+                await self._slots.acquire()
+
+        try:
+            await asyncio.wait_for(wait_for_borrowed(), timeout)
+        except asyncio.TimeoutError:
+            logging.warning("Closing BrowserPool with drivers still borrowed")
+        self._executor_closed = True
+        self._executor.shutdown(wait=False)
+
+    async def _release_quit(self, pooled: PooledDriver) -> None:
+        if self._executor_closed:
+            await asyncio.to_thread(self._quit, pooled)
+        else:
+            await self.run(self._quit, pooled)
+
+    # ------------------------------------------------------------------
+    # Blocking helpers – executed on the pool's threads
+    # ------------------------------------------------------------------
+    def _launch(self) -> PooledDriver:
+        driver = self.factory()
+        try:
+            if self._cookies:
+                # Seed the clearance before the first navigation so the warm-up
+                # load is served directly instead of re-running the challenge.
+                driver.execute_cdp_cmd("Network.setCookies", {"cookies": self._cookies})
+            driver.get(self.warm_url)
+            self._cookies = driver.get_cookies()
+        except Exception:
+            driver.quit()
+            raise
+        logging.info("Launched browser for pool (%s cookies cached)", len(self._cookies))
+        return PooledDriver(driver)
+
+    def _expired(self, pooled: PooledDriver) -> bool:
+        return (
+            pooled.uses >= self.max_uses
+            or time.monotonic() - pooled.created_at >= self.max_age_seconds
+        )
+
+    def _is_healthy(self, pooled: PooledDriver) -> bool:
+        if self._expired(pooled):
+            return False
+        try:
+            return pooled.driver.execute_script("return document.readyState") == "complete"
+        except Exception:
+            return False
+
+    @staticmethod
+    def _quit(pooled: Optional[PooledDriver]) -> None:
+        if pooled is None:
+            return
+        try:
+            pooled.driver.quit()
+        except Exception as e:
+            logging.warning(f"Failed to quit browser cleanly: {e}")
@@ -1,48 +1,195 @@
 import asyncio
-from datetime import datetime
+from datetime import datetime, timedelta
 import os
-from typing import Dict, List, Optional, Any, cast
+import time
+from typing import AsyncIterator, Callable, Dict, List, Optional, Any, Set, Tuple, Union, cast
 
 from clients.aws_base_client import AWSBaseClient
-from models.perplexity import PerplexityFeedItem
+from models.perplexity import FeedItemRecord, PerplexityFeedItem
+from utils.rate_limiter import backoff
+
+# DynamoDB hard limits per batch request
+BATCH_GET_LIMIT = 100
+BATCH_WRITE_LIMIT = 25
+MAX_BATCH_RETRIES = 8
+
+_SEGMENT_DONE = object()
+
+# Sparse GSI: only items still waiting for a podcast carry the ``pending`` attribute
+PENDING_FLAG = "1"
+
+
+class PartialWriteError(RuntimeError):
+    """A batched write failed after ``written`` of its items had already been stored."""
+
+    def __init__(self, message: str, written: int) -> None:
+        super().__init__(message)
+        self.written = written
+
 
 class DynamoDBClient(AWSBaseClient):
+    resources = ('dynamodb',)
+
     def __init__(self) -> None:
         super().__init__()
         self.table_name = os.environ.get('DYNAMODB_TABLE_NAME', 'reyy-ai')
-    
+        self.pending_index = os.environ.get('DYNAMODB_PENDING_INDEX', 'pending-index')
+        self.date_index = os.environ.get('DYNAMODB_DATE_INDEX', 'feed-date-index')
+        # Small key/value table for sync state (watermarks), keyed on ``id``
+        self.state_table_name = os.environ.get('DYNAMODB_STATE_TABLE_NAME', f'{self.table_name}-state')
+        self._table: Any = None
+        self._state_table: Any = None
+        # Called after writes that change what readers see (new items, podcast URLs)
+        self._write_listeners: List[Callable[[], None]] = []
+
+    async def open(self) -> None:
+        await super().open()
+        await self.table()
+
+    async def close(self) -> None:
+        self._table = None
+        self._state_table = None
+        await super().close()
+
+    async def table(self) -> Any:
+        """Return the shared ``Table`` handle built on the pooled resource."""
+        if self._table is None:
+            dynamodb = await self.resource('dynamodb')
+            self._table = await dynamodb.Table(self.table_name)
+        return self._table
+
+    async def state_table(self) -> Any:
+        if self._state_table is None:
+            dynamodb = await self.resource('dynamodb')
+            self._state_table = await dynamodb.Table(self.state_table_name)
+        return self._state_table
+
+    def add_write_listener(self, listener: Callable[[], None]) -> None:
+        self._write_listeners.append(listener)
+
+    def _notify_write(self) -> None:
+        for listener in self._write_listeners:
+            listener()
+
     async def put_items(self, items: List[Dict[str, Any]]) -> int:
         try:
-            async with self.session.resource('dynamodb') as dynamodb:
-                table = await dynamodb.Table(self.table_name)
-                
-                # Filter out items that already exist
-                new_items = []
-                for item in items:
-                    if 'uuid' not in item:
-                        new_items.append(item)
-                        continue
-                        
-                    existing_item = await self.get_item({'uuid': item['uuid']})
-                    if not existing_item:
-                        new_items.append(item)
-                
-                # Put each item individually since there's no batch put_items method
-                for item in new_items:
-                    await table.put_item(Item=item)
-                return len(new_items)
-                
+            return await self.put_new_items(items)
+        except PartialWriteError as e:
+            print(f"Error putting item in DynamoDB after {e.written} were written: {e}")
+            return e.written
         except Exception as e:
             print(f"Error putting item in DynamoDB: {e}")
             return 0
-    
+
+    async def put_new_items(self, items: List[Dict[str, Any]]) -> int:
+        """
+        Write the items that don't exist yet and return how many.
+
+        Raises on failure; a ``PartialWriteError`` carries how many items
+        were stored before the failing batch.
+        """
+        dynamodb = await self.resource('dynamodb')
+        # Collapse duplicate uuids up front: BatchWriteItem rejects a
+        # request that contains the same key twice.
+        new_items: List[Dict[str, Any]] = []
+        keyed: Dict[str, Dict[str, Any]] = {}
+        for item in items:
+            if 'uuid' not in item:
+                new_items.append(item)
+                continue
+            keyed.setdefault(item['uuid'], item)
+
+        # Filter out items that already exist
+        existing = await self._existing_uuids(dynamodb, list(keyed))
+        new_items.extend(item for uuid, item in keyed.items() if uuid not in existing)
+
+        written = 0
+        try:
+            written = await self._batch_put(dynamodb, [self.with_index_attributes(item) for item in new_items])
+        except PartialWriteError as e:
+            written = e.written
+            raise
+        finally:
+            if written:
+                self._notify_write()
+        return written
+
+    @staticmethod
+    def with_index_attributes(item: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Add the attributes the secondary indexes are keyed on.
+
+        ``pending`` marks items without a podcast yet (sparse pending index) and
+        ``feed_date`` partitions items by day for ``query_since``. GSI key
+        attributes can't be NULL, so a missing ``last_query_datetime`` is dropped.
+        """
+        item = dict(item)
+        if not item.get('s3_url'):
+            item['pending'] = PENDING_FLAG
+        if item.get('last_query_datetime'):
+            item['feed_date'] = item['last_query_datetime'][:10]
+        else:
+            item.pop('last_query_datetime', None)
+        return item
+
+    async def _existing_uuids(self, dynamodb: Any, uuids: List[str]) -> Set[str]:
+        """Look up which of ``uuids`` are already stored, 100 keys per BatchGetItem."""
+
+        async def fetch_chunk(chunk: List[str]) -> List[Dict[str, Any]]:
+            request: Dict[str, Any] = {
+                self.table_name: {
+                    'Keys': [{'uuid': uuid} for uuid in chunk],
+                    'ProjectionExpression': '#uuid',
+                    'ExpressionAttributeNames': {'#uuid': 'uuid'},
+                }
+            }
+            found: List[Dict[str, Any]] = []
+            for attempt in range(MAX_BATCH_RETRIES + 1):
+                resp = await dynamodb.batch_get_item(RequestItems=request)
+                found.extend(resp.get('Responses', {}).get(self.table_name, []))
+                request = resp.get('UnprocessedKeys') or {}
+                if not request:
+                    return found
+                await backoff(attempt)
+            raise RuntimeError(f"BatchGetItem left unprocessed keys after {MAX_BATCH_RETRIES} retries")
+
+        chunks = [uuids[i:i + BATCH_GET_LIMIT] for i in range(0, len(uuids), BATCH_GET_LIMIT)]
+        results = await asyncio.gather(*(fetch_chunk(chunk) for chunk in chunks))
+        return {row['uuid'] for rows in results for row in rows}
+
+    async def _batch_put(self, dynamodb: Any, items: List[Dict[str, Any]]) -> int:
+        """
+        Write ``items`` 25 at a time, resubmitting UnprocessedItems with backoff.
+
+        Returns how many were written; on failure raises ``PartialWriteError``
+        with the count stored up to that point.
+        """
+        written = 0
+        for i in range(0, len(items), BATCH_WRITE_LIMIT):
+            chunk = items[i:i + BATCH_WRITE_LIMIT]
+            request: Dict[str, Any] = {self.table_name: [{'PutRequest': {'Item': item}} for item in chunk]}
+            try:
+                for attempt in range(MAX_BATCH_RETRIES + 1):
+                    resp = await dynamodb.batch_write_item(RequestItems=request)
+                    request = resp.get('UnprocessedItems') or {}
+                    if not request:
+                        break
+                    await backoff(attempt)
+                else:
+                    raise RuntimeError(f"BatchWriteItem left unprocessed items after {MAX_BATCH_RETRIES} retries")
+            except Exception as e:
+                # Whatever is still in ``request`` was never confirmed
+                written += len(chunk) - len(request.get(self.table_name, []))
+                raise PartialWriteError(str(e), written) from e
+            written += len(chunk)
+        return written
+
     async def get_item(self, key: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         try:
-            async with self.session.resource('dynamodb') as dynamodb:
-                table = await dynamodb.Table(self.table_name)
-                response = await table.get_item(Key=key)
-                return cast(Optional[Dict[str, Any]], response.get('Item'))
-                
+            table = await self.table()
+            response = await table.get_item(Key=key)
+            return cast(Optional[Dict[str, Any]], response.get('Item'))
+
         except Exception as e:
             print(f"Error getting item from DynamoDB: {e}")
             return None
@@ -56,64 +203,324 @@ class DynamoDBClient(AWSBaseClient):
     ) -> List[PerplexityFeedItem]:
 
         try:
-            async with self.session.resource("dynamodb") as dynamodb:
-                table = await dynamodb.Table(self.table_name)
-
-                filters: list[str] = []
-                names: dict[str, str] = {}
-                values: dict[str, str] = {}
-
-                if last_query_datetime:
-                    filters.append("#last_dt > :last_dt")
-                    names["#last_dt"] = "last_query_datetime"
-                    values[":last_dt"] = last_query_datetime.isoformat()
-
-                if blank_s3_only:
-                    filters.append("attribute_not_exists(#s3) OR #s3 = :empty")
-                    names["#s3"] = "s3_url"
-                    values[":empty"] = ""
-
-                base_kwargs: dict = {}
-                if filters:
-                    base_kwargs["FilterExpression"] = " AND ".join(filters)
-                if names:
-                    base_kwargs["ExpressionAttributeNames"] = names
-                if values:
-                    base_kwargs["ExpressionAttributeValues"] = values
-
-                # ── paginated scan ─────────────────────────────────
-                items: list = []
-                start_key = None
-
-                while len(items) < limit:
-                    page_limit = min(1000, limit - len(items))  # 1 MB ≈ ~1 000 rows
-                    kwargs = {"Limit": page_limit, **base_kwargs}
-                    if start_key:
-                        kwargs["ExclusiveStartKey"] = start_key
+            table = await self.table()
 
-                    resp = await table.scan(**kwargs)
-                    items.extend(resp.get("Items", []))
+            filters: list[str] = []
+            names: dict[str, str] = {}
+            values: dict[str, str] = {}
+
+            if last_query_datetime:
+                filters.append("#last_dt > :last_dt")
+                names["#last_dt"] = "last_query_datetime"
+                values[":last_dt"] = last_query_datetime.isoformat()
+
+            if blank_s3_only:
+                filters.append("attribute_not_exists(#s3) OR #s3 = :empty")
+                names["#s3"] = "s3_url"
+                values[":empty"] = ""
+
+            base_kwargs: dict = {}
+            if filters:
+                base_kwargs["FilterExpression"] = " AND ".join(filters)
+            if names:
+                base_kwargs["ExpressionAttributeNames"] = names
+            if values:
+                base_kwargs["ExpressionAttributeValues"] = values
+
+            # ── paginated scan ─────────────────────────────────
+            items: list = []
+            start_key = None
+
+            while len(items) < limit:
+                page_limit = min(1000, limit - len(items))  # 1 MB ≈ ~1 000 rows
+                kwargs = {"Limit": page_limit, **base_kwargs}
+                if start_key:
+                    kwargs["ExclusiveStartKey"] = start_key
+
+                resp = await table.scan(**kwargs)
+                items.extend(resp.get("Items", []))
+
+                start_key = resp.get("LastEvaluatedKey")
+                if not start_key:
+                    break
 
+            return [PerplexityFeedItem(**item) for item in items[:limit]]
+
+        except Exception:
+            raise
+
+    async def scan_iter(
+            self,
+            *,
+            segments: int = 4,
+            projection: Optional[List[str]] = None,
+            raw: bool = False,
+            records: bool = False,
+            page_size: int = 1000,
+    ) -> AsyncIterator[Union[Dict[str, Any], FeedItemRecord, PerplexityFeedItem]]:
+        """
+        Stream the whole table with a parallel scan across ``segments`` workers.
+
+        Each worker pages through its own ``Segment`` and hands pages over a
+        bounded queue, so at most about ``2 x segments`` pages are held in
+        memory however large the table is. Rows are yielded as they arrive
+        (no ordering guarantee): as raw dicts when ``raw`` is set, as slotted
+        ``FeedItemRecord`` when ``records`` is set, and as
+        ``PerplexityFeedItem`` otherwise. A ``projection`` requires ``raw``,
+        since a partial row won't fill either model; without it a
+        ``ValueError`` is raised before anything is scanned.
+        """
+        if projection and not raw:
+            raise ValueError("scan_iter with a projection yields partial rows; pass raw=True")
+        table = await self.table()
+        base_kwargs: Dict[str, Any] = {"TotalSegments": segments, "Limit": page_size}
+        if projection:
+            names = {f"#p{i}": attr for i, attr in enumerate(projection)}
+            base_kwargs["ProjectionExpression"] = ", ".join(names)
+            base_kwargs["ExpressionAttributeNames"] = names
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=segments * 2)
+
+        async def scan_segment(segment: int) -> None:
+            kwargs = {"Segment": segment, **base_kwargs}
+            try:
+                while True:
+                    resp = await table.scan(**kwargs)
+                    await queue.put(resp.get("Items", []))
                     start_key = resp.get("LastEvaluatedKey")
                     if not start_key:
                         break
+                    kwargs["ExclusiveStartKey"] = start_key
+                await queue.put(_SEGMENT_DONE)
+            except Exception as e:
+                await queue.put(e)
 
-                return [PerplexityFeedItem(**item) for item in items[:limit]]
+        workers = [asyncio.create_task(scan_segment(segment)) for segment in range(segments)]
+        try:
+            finished = 0
+            while finished < segments:
+                page = await queue.get()
+                if page is _SEGMENT_DONE:
+                    finished += 1
+                    continue
+                if isinstance(page, Exception):
+                    raise page
+                if raw:
+                    for row in page:
+                        yield row
+                elif records:
+                    for row in page:
+                        yield FeedItemRecord.from_row(row)
+                else:
+                    for row in page:
+                        yield PerplexityFeedItem(**row)
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
 
-        except Exception:
-            raise
+    async def query_pending(self, limit: Optional[int] = None, page_size: int = 100) -> AsyncIterator[PerplexityFeedItem]:
+        """
+        Yield items still waiting for a podcast, read from the sparse pending index.
+
+        Pages are fetched lazily as the caller iterates, so cost scales with
+        the number of pending items rather than the table size.
+        """
+        kwargs: Dict[str, Any] = {
+            "IndexName": self.pending_index,
+            "KeyConditionExpression": "#pending = :pending",
+            "ExpressionAttributeNames": {"#pending": "pending"},
+            "ExpressionAttributeValues": {":pending": PENDING_FLAG},
+        }
+        async for item in self._query(kwargs, limit, page_size):
+            yield item
+
+    async def query_since(self, since: datetime, limit: Optional[int] = None,
+                          page_size: int = 100) -> AsyncIterator[PerplexityFeedItem]:
+        """Yield items with ``last_query_datetime`` after ``since``, one day partition at a time."""
+        day = since.date()
+        today = datetime.now().date()
+        remaining = limit
+        while day <= today and (remaining is None or remaining > 0):
+            kwargs: Dict[str, Any] = {
+                "IndexName": self.date_index,
+                "KeyConditionExpression": "#feed_date = :feed_date AND #last_dt > :last_dt",
+                "ExpressionAttributeNames": {"#feed_date": "feed_date", "#last_dt": "last_query_datetime"},
+                "ExpressionAttributeValues": {":feed_date": day.isoformat(), ":last_dt": since.isoformat()},
+            }
+            async for item in self._query(kwargs, remaining, page_size):
+                if remaining is not None:
+                    remaining -= 1
+                yield item
+            day += timedelta(days=1)
+
+    async def feed_page(self, limit: int, cursor: Optional[Dict[str, Any]] = None,
+                        lookback_days: int = 30) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """
+        One page of the feed, newest ``last_query_datetime`` first.
+
+        Walks the date index one day partition at a time, back at most
+        ``lookback_days`` from today. Returns the raw rows and the cursor for
+        the next page (``day`` plus DynamoDB's start key), or None at the end.
+        """
+        table = await self.table()
+        today = datetime.now().date()
+        oldest = today - timedelta(days=lookback_days)
+        day = datetime.strptime(cursor['day'], '%Y-%m-%d').date() if cursor else today
+        start_key = cursor.get('key') if cursor else None
+
+        rows: List[Dict[str, Any]] = []
+        while day >= oldest:
+            kwargs: Dict[str, Any] = {
+                "IndexName": self.date_index,
+                "KeyConditionExpression": "#feed_date = :feed_date",
+                "ExpressionAttributeNames": {"#feed_date": "feed_date"},
+                "ExpressionAttributeValues": {":feed_date": day.isoformat()},
+                "ScanIndexForward": False,
+                "Limit": limit - len(rows),
+            }
+            if start_key:
+                kwargs["ExclusiveStartKey"] = start_key
+            resp = await table.query(**kwargs)
+            rows.extend(resp.get("Items", []))
+            start_key = resp.get("LastEvaluatedKey")
+            if len(rows) >= limit:
+                if start_key:
+                    return rows, {'day': day.isoformat(), 'key': start_key}
+                day -= timedelta(days=1)
+                return rows, {'day': day.isoformat()} if day >= oldest else None
+            if not start_key:
+                day -= timedelta(days=1)
+        return rows, None
+
+    async def _query(self, kwargs: Dict[str, Any], limit: Optional[int], page_size: int) -> AsyncIterator[PerplexityFeedItem]:
+        table = await self.table()
+        yielded = 0
+        start_key = None
+        while limit is None or yielded < limit:
+            page_limit = page_size if limit is None else min(page_size, limit - yielded)
+            page_kwargs = {"Limit": page_limit, **kwargs}
+            if start_key:
+                page_kwargs["ExclusiveStartKey"] = start_key
+
+            resp = await table.query(**page_kwargs)
+            for row in resp.get("Items", []):
+                yield PerplexityFeedItem(**row)
+                yielded += 1
+
+            start_key = resp.get("LastEvaluatedKey")
+            if not start_key:
+                break
 
     async def update_item(self, key: Dict[str, Any], s3_url: str) -> None:
+        """Attach the podcast URL to an item and take it off the pending index; raises on failure."""
+        table = await self.table()
+        now = datetime.now().isoformat()
+        # Dropping ``pending`` takes the item out of the sparse pending index
+        await table.update_item(Key=key, UpdateExpression='SET s3_url = :s3_url, last_query_datetime = :last_query_datetime, '\
+                    'feed_date = :feed_date REMOVE pending',
+                    ExpressionAttributeValues={':s3_url': s3_url, ':last_query_datetime': now, ':feed_date': now[:10]})
+        self._notify_write()
+
+    # ------------------------------------------------------------------
+    # Sync state
+    # ------------------------------------------------------------------
+    async def get_watermark(self, topic: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the feed watermark for ``topic``: recent ``uuids``, ``last_query_datetime`` and ``version``.
+
+        None means the topic has never been synced. Read errors are raised
+        rather than mistaken for that, which would send the sync on a full
+        first-run walk.
+        """
+        table = await self.state_table()
+        response = await table.get_item(Key={'id': f'watermark#{topic}'}, ConsistentRead=True)
+        item = response.get('Item')
+        if item is None:
+            return None
+        item['version'] = int(item.get('version', 0))
+        return cast(Dict[str, Any], item)
+
+    async def put_watermark(self, topic: str, uuids: List[str], last_query_datetime: Optional[str],
+                            version: int) -> bool:
+        """
+        Store the watermark if it is still at ``version`` (0 for a new topic).
+
+        Returns False when another run moved it first, so concurrent syncs
+        can't roll it back.
+        """
         try:
-            async with self.session.resource('dynamodb') as dynamodb:
-                table = await dynamodb.Table(self.table_name)
-                await table.update_item(Key=key, UpdateExpression='SET s3_url = :s3_url, last_query_datetime = :last_query_datetime',\
-                            ExpressionAttributeValues={':s3_url': s3_url, ':last_query_datetime': datetime.now().isoformat()})
+            table = await self.state_table()
+            item: Dict[str, Any] = {
+                'id': f'watermark#{topic}',
+                'uuids': uuids,
+                'version': version + 1,
+                'updated_at': datetime.now().isoformat(),
+            }
+            if last_query_datetime:
+                item['last_query_datetime'] = last_query_datetime
+            if version:
+                condition = {'ConditionExpression': 'version = :version',
+                             'ExpressionAttributeValues': {':version': version}}
+            else:
+                condition = {'ConditionExpression': 'attribute_not_exists(id)'}
+            await table.put_item(Item=item, **condition)
+            return True
+
         except Exception as e:
-            print(f"Error updating item in DynamoDB: {e}")
-            return None
+            if getattr(e, 'response', {}).get('Error', {}).get('Code') == 'ConditionalCheckFailedException':
+                return False
+            print(f"Error putting watermark in DynamoDB: {e}")
+            return False
+
+    async def acquire_lease(self, name: str, owner: str, ttl_seconds: int) -> bool:
+        """
+        Take or renew the lease ``name`` for ``owner`` until ``ttl_seconds`` from now.
+
+        Succeeds when the lease is free, expired, or already held by
+        ``owner``; returns False while someone else holds it.
+        """
+        try:
+            table = await self.state_table()
+            now = int(time.time())
+            await table.put_item(
+                Item={'id': f'lease#{name}', 'owner': owner, 'expires_at': now + ttl_seconds},
+                ConditionExpression='attribute_not_exists(id) OR #owner = :owner OR expires_at < :now',
+                ExpressionAttributeNames={'#owner': 'owner'},
+                ExpressionAttributeValues={':owner': owner, ':now': now},
+            )
+            return True
+
+        except Exception as e:
+            if getattr(e, 'response', {}).get('Error', {}).get('Code') == 'ConditionalCheckFailedException':
+                return False
+            print(f"Error acquiring lease in DynamoDB: {e}")
+            return False
+
+    async def release_lease(self, name: str, owner: str) -> bool:
+        """Give up the lease ``name`` if ``owner`` still holds it."""
+        try:
+            table = await self.state_table()
+            await table.delete_item(
+                Key={'id': f'lease#{name}'},
+                ConditionExpression='#owner = :owner',
+                ExpressionAttributeNames={'#owner': 'owner'},
+                ExpressionAttributeValues={':owner': owner},
+            )
+            return True
+
+        except Exception as e:
+            if getattr(e, 'response', {}).get('Error', {}).get('Code') == 'ConditionalCheckFailedException':
+                return False
+            print(f"Error releasing lease in DynamoDB: {e}")
+            return False
 
 if __name__ == "__main__":
-    from container import ServicesContainer
-    client = ServicesContainer().dynamodb_client()
-    print(len(asyncio.run(client.scan(limit=10,blank_s3_only= True))))
\ No newline at end of file
+    async def main() -> None:
+        client = DynamoDBClient()
+        try:
+            print(len(await client.scan(limit=10, blank_s3_only=True)))
+        finally:
+            await client.close()
+
+    asyncio.run(main())
@@ -1,18 +1,56 @@
 import os
-from typing import Dict, Any, Optional
+from typing import AsyncIterator, Dict, Any, List, Optional, Union
 from jinja2 import Environment, BaseLoader
 import aiohttp  
 import asyncio
 
+from utils.metrics import time_call
+from utils.rate_limiter import TokenBucket, backoff
+
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+
 class GeminiClient:
     def __init__(self) -> None:
         self.api_key = os.environ.get('GEMINI_API_KEY')
-        self.base_url = "https://generativelanguage.googleapis.com/v1beta/models"
+        self.base_url = os.environ.get('GEMINI_BASE_URL', "https://generativelanguage.googleapis.com/v1beta/models")
         self.default_model = "gemini-1.5-pro"
         self.jinja_env = Environment(loader=BaseLoader())
+
+        self.max_concurrency = int(os.environ.get('GEMINI_MAX_CONCURRENCY', '8'))
+        self.max_retries = int(os.environ.get('GEMINI_MAX_RETRIES', '5'))
+        self.timeout = float(os.environ.get('GEMINI_TIMEOUT', '60'))
+        rpm = float(os.environ.get('GEMINI_RPM', '60'))
+        self.tpm = float(os.environ.get('GEMINI_TPM', '1000000'))
+        # Allow a short burst of up to a second's worth of budget, at least one request;
+        # larger prompts are charged across several refills
+        self.request_bucket = TokenBucket(rate=rpm, capacity=max(1.0, rpm / 60))
+        self.token_bucket = TokenBucket(rate=self.tpm, capacity=max(1.0, self.tpm / 60))
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    @classmethod
+    async def lifecycle(cls) -> AsyncIterator["GeminiClient"]:
+        """Async generator for ``providers.Resource``."""
+        client = cls()
+        try:
+            yield client
+        finally:
+            await client.close()
     
     async def generate_content(self, prompt: str, model: Optional[str] = None, 
                              temperature: float = 0.7, max_tokens: int = 1024) -> Optional[Dict[str, Any]]:
+        """
+        Call ``generateContent``, retrying 429/5xx responses; returns None on failure.
+
+        Raises ``ValueError`` for a request estimated above ``GEMINI_TPM``,
+        which could never fit in a minute's token budget.
+        """
         model_name = model or self.default_model
         url = f"{self.base_url}/{model_name}:generateContent?key={self.api_key}"
         
@@ -25,16 +63,86 @@ class GeminiClient:
                 "topK": 40
             }
         }
-        
+        # Reserve a rough estimate up front (~4 chars per token) and settle
+        # against the real usage reported in the response.
+        estimated_tokens = len(prompt) // 4 + max_tokens
+        if estimated_tokens > self.tpm:
+            raise ValueError(f"Gemini request of ~{estimated_tokens} tokens exceeds GEMINI_TPM={self.tpm:g}")
+
+        for attempt in range(self.max_retries + 1):
+            retry_after: Optional[float] = None
+            try:
+                async with self._semaphore:
+                    await self.request_bucket.acquire()
+                    await self.token_bucket.acquire(estimated_tokens)
+                    session = self._get_session()
+                    with time_call("gemini", "generate_content"):
+                        async with session.post(url, json=payload) as response:
+                            if response.status in RETRYABLE_STATUSES and attempt < self.max_retries:
+                                retry_after = self._retry_after(response)
+                                raise aiohttp.ClientResponseError(
+                                    response.request_info, response.history,
+                                    status=response.status, message=response.reason or "",
+                                )
+                            response.raise_for_status()
+                            result = await response.json()
+
+                used = result.get("usageMetadata", {}).get("totalTokenCount")
+                if used is not None:
+                    self.token_bucket.adjust(used - estimated_tokens)
+                return result
+
+            except (aiohttp.ClientResponseError, aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                status = getattr(e, "status", None)
+                if (status is not None and status not in RETRYABLE_STATUSES) or attempt >= self.max_retries:
+                    print(f"Error calling Gemini API: {e}")
+                    return None
+                print(f"Retrying Gemini API call (attempt {attempt + 1}) after error: {e}")
+                if retry_after is not None:
+                    await asyncio.sleep(retry_after)
+                else:
+                    await backoff(attempt, base=0.5, cap=30.0)
+            except Exception as e:
+                print(f"Error calling Gemini API: {e}")
+                return None
+        return None
+
+    async def generate_many(self, prompts: List[str], model: Optional[str] = None,
+                            temperature: float = 0.7,
+                            max_tokens: int = 1024) -> List[Union[Optional[Dict[str, Any]], Exception]]:
+        """
+        Run ``generate_content`` for every prompt concurrently, within the shared limits.
+
+        Results keep input order; a prompt that raised (e.g. one over
+        ``GEMINI_TPM``) gets its exception in place of a result rather than
+        failing the rest of the batch.
+        """
+        return await asyncio.gather(
+            *(self.generate_content(prompt, model, temperature, max_tokens) for prompt in prompts),
+            return_exceptions=True,
+        )
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_concurrency, ttl_dns_cache=300),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        return self._session
+
+    @staticmethod
+    def _retry_after(response: aiohttp.ClientResponse) -> Optional[float]:
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(url, json=payload) as response:
-                    response.raise_for_status()
-                    return await response.json()
-        except Exception as e:
-            print(f"Error calling Gemini API: {e}")
+            return float(response.headers["Retry-After"])
+        except (KeyError, ValueError):
             return None
     
 if __name__ == "__main__":
-    client = GeminiClient()
-    print(asyncio.run(client.generate_content("Hello, how are you?")))
\ No newline at end of file
+    async def main() -> None:
+        client = GeminiClient()
+        try:
+            print(await client.generate_content("Hello, how are you?"))
+        finally:
+            await client.close()
+
+    asyncio.run(main())
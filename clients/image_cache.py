@@ -0,0 +1,166 @@
+import asyncio
+import hashlib
+import io
+import logging
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import AsyncIterator, Dict, List, Optional
+
+import aiohttp
+
+from utils.disk_cache import DiskLRUCache
+from utils.metrics import IMAGE_BYTES, IMAGE_LOOKUPS, time_call
+
+
+def downscale(data: bytes, max_side: int, quality: int) -> bytes:
+    """Fit an image within ``max_side`` pixels and re-encode it as JPEG (runs in the pool)."""
+    from PIL import Image, ImageOps
+
+    with Image.open(io.BytesIO(data)) as image:
+        if image.format == "JPEG" and max(image.size) <= max_side:
+            return data
+        # Lets the JPEG decoder skip straight to a reduced scale
+        image.draft("RGB", (max_side, max_side))
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((max_side, max_side), Image.LANCZOS)
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+        out = io.BytesIO()
+        image.save(out, "JPEG", quality=quality, optimize=True)
+        return out.getvalue()
+
+
+class ImageCache:
+    """
+    Local, downscaled copies of the images handed to podcastfy.
+
+    ``fetch_many`` downloads an item's images concurrently over one pooled
+    session, shrinks them to ``IMAGE_MAX_SIDE`` in a worker pool and stores
+    them in an LRU directory under the hash of their content, so the same
+    picture behind different URLs is kept once. A small per-URL reference
+    entry points at the content, so a repeat URL is served without a
+    download.
+    """
+
+    def __init__(self) -> None:
+        self.enabled = os.environ.get('IMAGE_CACHE_ENABLED', 'true').lower() == 'true'
+        self.local = DiskLRUCache(
+            root=os.environ.get('IMAGE_CACHE_DIR', 'data/cache/images'),
+            max_bytes=int(os.environ.get('IMAGE_CACHE_MAX_MB', '512')) * 1024 * 1024,
+        )
+        self.max_side = int(os.environ.get('IMAGE_MAX_SIDE', '1024'))
+        self.quality = int(os.environ.get('IMAGE_JPEG_QUALITY', '85'))
+        self.max_download_bytes = int(float(os.environ.get('IMAGE_MAX_DOWNLOAD_MB', '20')) * 1024 * 1024)
+        self.concurrency = int(os.environ.get('IMAGE_FETCH_CONCURRENCY', '8'))
+        self.timeout = float(os.environ.get('IMAGE_FETCH_TIMEOUT', '30'))
+
+        workers = int(os.environ.get('IMAGE_RESIZE_WORKERS', '2'))
+        self._executor: Executor
+        if os.environ.get('IMAGE_RESIZE_EXECUTOR', 'process') == 'thread':
+            self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="image")
+        else:
+            # Spawn, not fork: the parent runs grpc/aiohttp threads that don't survive a fork
+            self._executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        self._session: Optional[aiohttp.ClientSession] = None
+        # One download per URL at a time, shared by every item that wants it
+        self._pending: Dict[str, asyncio.Future] = {}
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    @classmethod
+    async def lifecycle(cls) -> AsyncIterator["ImageCache"]:
+        """Async generator for ``providers.Resource``."""
+        cache = cls()
+        try:
+            yield cache
+        finally:
+            await cache.close()
+
+    async def fetch_many(self, urls: Optional[List[str]]) -> List[str]:
+        """
+        Local paths for ``urls``, in order.
+
+        Images that can't be fetched or decoded are left out rather than
+        failing the item, as are repeats of the same picture. With the
+        cache disabled the URLs are returned unchanged.
+        """
+        if not urls:
+            return []
+        if not self.enabled:
+            return list(urls)
+        paths = await asyncio.gather(*(self.fetch(url) for url in dict.fromkeys(urls)))
+        # Distinct URLs can resolve to the same stored image
+        return list(dict.fromkeys(path for path in paths if path))
+
+    async def fetch(self, url: str) -> Optional[str]:
+        pending = self._pending.get(url)
+        if pending is None:
+            pending = asyncio.ensure_future(self._fetch(url))
+            self._pending[url] = pending
+            pending.add_done_callback(lambda _: self._pending.pop(url, None))
+        try:
+            # Shielded so one cancelled item doesn't abort a download others wait on
+            return await asyncio.shield(pending)
+        except Exception as e:
+            IMAGE_LOOKUPS.labels("error").inc()
+            logging.warning(f"Skipping image {url}: {type(e).__name__}: {e}")
+            return None
+
+    async def _fetch(self, url: str) -> str:
+        ref = f"{hashlib.sha256(url.encode('utf-8')).hexdigest()}.ref"
+        ref_path = await asyncio.to_thread(self.local.get, ref)
+        if ref_path:
+            name = await asyncio.to_thread(self._read_ref, ref_path)
+            path = await asyncio.to_thread(self.local.get, name) if name else None
+            if path:
+                IMAGE_LOOKUPS.labels("hit").inc()
+                return path
+
+        IMAGE_LOOKUPS.labels("miss").inc()
+        data = await self._download(url)
+        # Named by content and output settings, so identical images share an entry
+        name = f"{hashlib.sha256(data).hexdigest()[:32]}-{self.max_side}q{self.quality}.jpg"
+        path = await asyncio.to_thread(self.local.get, name)
+        if path is None:
+            loop = asyncio.get_running_loop()
+            resized = await loop.run_in_executor(self._executor, downscale, data, self.max_side, self.quality)
+            IMAGE_BYTES.labels("stored").inc(len(resized))
+            path = await asyncio.to_thread(self.local.put_bytes, name, resized)
+        await asyncio.to_thread(self.local.put_bytes, ref, name.encode("utf-8"))
+        return path
+
+    async def _download(self, url: str) -> bytes:
+        with time_call("images", "GET"):
+            async with self._get_session().get(url) as response:
+                response.raise_for_status()
+                if (response.content_length or 0) > self.max_download_bytes:
+                    raise ValueError(f"image is {response.content_length} bytes")
+                buffer = bytearray()
+                async for chunk in response.content.iter_chunked(64 * 1024):
+                    buffer += chunk
+                    if len(buffer) > self.max_download_bytes:
+                        raise ValueError(f"image exceeds {self.max_download_bytes} bytes")
+        data = bytes(buffer)
+        IMAGE_BYTES.labels("downloaded").inc(len(data))
+        return data
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.concurrency, ttl_dns_cache=300),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        return self._session
+
+    @staticmethod
+    def _read_ref(path: str) -> Optional[str]:
+        try:
+            with open(path, encoding="utf-8") as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
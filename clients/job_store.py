@@ -0,0 +1,313 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Any, AsyncIterator, List, Optional, Set, Tuple
+
+from models.perplexity import PerplexityFeedItem
+from models.podcast import PodcastJob, PodcastTask, PodcastTaskStatus
+from utils.lease import lease_expiry, process_owner
+
+ACTIVE_STATUSES = (PodcastTaskStatus.PENDING.value, PodcastTaskStatus.RUNNING.value)
+
+# Active rows another process owns and has stopped renewing
+_ORPHANED = "status IN (?, ?) AND owner IS NOT ? AND (lease_expires IS NULL OR lease_expires < ?)"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    created_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS job_items (
+    job_id TEXT NOT NULL REFERENCES jobs(id),
+    uuid TEXT NOT NULL,
+    status TEXT NOT NULL,
+    stage TEXT,
+    s3_url TEXT,
+    error TEXT,
+    timings TEXT NOT NULL DEFAULT '{}',
+    item TEXT NOT NULL,
+    owner TEXT,
+    lease_expires REAL,
+    attempt INTEGER NOT NULL DEFAULT 1,
+    retry_after REAL,
+    created_at TEXT NOT NULL,
+    finished_at TEXT,
+    PRIMARY KEY (job_id, uuid)
+);
+-- At most one active row per feed item: overlapping triggers can't queue it twice
+CREATE UNIQUE INDEX IF NOT EXISTS job_items_active_uuid
+    ON job_items(uuid) WHERE status IN ('pending', 'running');
+CREATE INDEX IF NOT EXISTS job_items_uuid ON job_items(uuid);
+CREATE INDEX IF NOT EXISTS job_items_status ON job_items(status);
+"""
+
+
+class JobStore:
+    """
+    SQLite-backed queue of podcast jobs.
+
+    Rows outlive the process so incomplete items can be resumed after a
+    restart. Each active row records the process that owns it and a lease
+    the owner renews every ``JOB_LEASE_SECONDS / 3``; a row whose lease has
+    lapsed is reclaimed by any process sharing the file, whatever host or
+    pid it came from. Pids and hostnames are reused across container
+    restarts, so they are never taken as proof that the owner is alive.
+
+    A failed item is queued again only after a backoff that doubles with
+    each attempt, and not at all once it has failed ``PODCAST_MAX_ATTEMPTS``
+    times in a row.
+    """
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        self.path = path or os.environ.get('JOB_STORE_PATH', 'data/jobs.sqlite3')
+        self.lease_seconds = float(os.environ.get('JOB_LEASE_SECONDS', '60'))
+        self.max_attempts = int(os.environ.get('PODCAST_MAX_ATTEMPTS', '5'))
+        self.retry_base_seconds = float(os.environ.get('PODCAST_RETRY_BASE_SECONDS', '60'))
+        self.retry_max_seconds = float(os.environ.get('PODCAST_RETRY_MAX_SECONDS', '3600'))
+        self.owner = process_owner()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._heartbeat: Optional[asyncio.Task] = None
+
+    async def open(self) -> None:
+        await asyncio.to_thread(self._open)
+        self._heartbeat = asyncio.create_task(self._run_heartbeat(), name="job-store-heartbeat")
+
+    async def close(self) -> None:
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+            try:
+                await self._heartbeat
+            except asyncio.CancelledError:
+                pass
+            self._heartbeat = None
+        await asyncio.to_thread(self._close)
+
+    @classmethod
+    async def lifecycle(cls) -> AsyncIterator["JobStore"]:
+        """Async generator for ``providers.Resource``."""
+        store = cls()
+        await store.open()
+        try:
+            yield store
+        finally:
+            await store.close()
+
+    async def create_job(self, items: List[PerplexityFeedItem],
+                         read_at: Optional[datetime] = None) -> Tuple[Optional[str], List[PodcastTask]]:
+        """
+        Create a job and enqueue every item not already active in another job.
+
+        ``read_at`` is when ``items`` were read as pending: an item that
+        succeeded since then was finished by another job after the read, so
+        it is skipped too. One that succeeded before it is pending again on
+        purpose and is queued. Failed items wait out their retry backoff and
+        are dropped once out of attempts. When nothing is queued no job is
+        created and the id is None.
+        """
+        return await asyncio.to_thread(self._create_job, items, read_at)
+
+    async def save_task(self, task: PodcastTask) -> None:
+        await asyncio.to_thread(self._save_task, task)
+
+    async def get_job(self, job_id: str) -> Optional[PodcastJob]:
+        return await asyncio.to_thread(self._get_job, job_id)
+
+    async def blocked_uuids(self) -> Set[str]:
+        """Uuids ``create_job`` would not queue now: active, backing off or out of attempts."""
+        return await asyncio.to_thread(self._blocked_uuids)
+
+    async def has_orphans(self) -> bool:
+        """Whether ``claim_orphans`` would find anything, without claiming it."""
+        return await asyncio.to_thread(self._has_orphans)
+
+    async def claim_orphans(self) -> List[Tuple[PodcastTask, PerplexityFeedItem]]:
+        """Take ownership of active rows whose owner's lease has expired."""
+        return await asyncio.to_thread(self._claim_orphans)
+
+    async def _run_heartbeat(self) -> None:
+        # Renew well inside the lease so one slow write doesn't let it lapse
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                await asyncio.to_thread(self._renew_leases)
+            except Exception as e:
+                logging.error(f"Renewing job leases failed: {e}")
+
+    # ------------------------------------------------------------------
+    # Blocking helpers – run via asyncio.to_thread
+    # ------------------------------------------------------------------
+    def _open(self) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        conn.executescript(SCHEMA)
+        self._conn = conn
+
+    def _close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                # Items left active by a drain can be picked up right away
+                self._conn.execute(
+                    "UPDATE job_items SET lease_expires = 0 WHERE owner = ? AND status IN (?, ?)",
+                    (self.owner, *ACTIVE_STATUSES),
+                )
+                self._conn.close()
+                self._conn = None
+
+    def _renew_leases(self) -> None:
+        with self._lock:
+            self._db().execute(
+                "UPDATE job_items SET lease_expires = ? WHERE owner = ? AND status IN (?, ?)",
+                (lease_expiry(self.lease_seconds), self.owner, *ACTIVE_STATUSES),
+            )
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._open()
+        assert self._conn is not None
+        return self._conn
+
+    def _create_job(self, items: List[PerplexityFeedItem],
+                    read_at: Optional[datetime]) -> Tuple[Optional[str], List[PodcastTask]]:
+        job_id = uuid.uuid4().hex
+        now = datetime.now()
+        finished_since = (read_at or now).isoformat()
+        queued: List[PodcastTask] = []
+        with self._lock:
+            db = self._db()
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                db.execute("INSERT INTO jobs (id, created_at) VALUES (?, ?)", (job_id, now.isoformat()))
+                for item in items:
+                    last = db.execute(
+                        "SELECT status, attempt, retry_after, finished_at FROM job_items"
+                        " WHERE uuid = ? ORDER BY created_at DESC LIMIT 1",
+                        (item.uuid,),
+                    ).fetchone()
+                    attempt = self._next_attempt(last, finished_since, now.timestamp())
+                    if attempt is None:
+                        continue
+                    db.execute(
+                        "INSERT INTO job_items"
+                        " (job_id, uuid, status, item, owner, lease_expires, attempt, created_at)"
+                        " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        (job_id, item.uuid, PodcastTaskStatus.PENDING.value, item.model_dump_json(),
+                         self.owner, lease_expiry(self.lease_seconds), attempt, now.isoformat()),
+                    )
+                    queued.append(PodcastTask(job_id=job_id, uuid=item.uuid, created_at=now))
+                db.execute("COMMIT" if queued else "ROLLBACK")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+        return (job_id if queued else None), queued
+
+    def _next_attempt(self, last: Any, finished_since: str, now: float) -> Optional[int]:
+        """Attempt number for queueing an item whose latest row is ``last``, or None to skip it."""
+        if last is None:
+            return 1
+        status = PodcastTaskStatus(last["status"])
+        if status in (PodcastTaskStatus.PENDING, PodcastTaskStatus.RUNNING):
+            return None
+        if status == PodcastTaskStatus.SUCCEEDED:
+            # A pending-index read can predate the item finishing elsewhere; don't redo it
+            return None if (last["finished_at"] or "") >= finished_since else 1
+        if last["attempt"] >= self.max_attempts or (last["retry_after"] or 0) > now:
+            return None
+        return last["attempt"] + 1
+
+    def _save_task(self, task: PodcastTask) -> None:
+        with self._lock:
+            self._db().execute(
+                "UPDATE job_items SET status = ?, stage = ?, s3_url = ?, error = ?, timings = ?, finished_at = ?,"
+                " retry_after = CASE WHEN ? THEN ? + MIN(?, ? * (1 << (attempt - 1))) END"
+                " WHERE job_id = ? AND uuid = ?",
+                (task.status.value, task.stage, task.s3_url, task.error, json.dumps(task.timings),
+                 task.finished_at.isoformat() if task.finished_at else None,
+                 task.status == PodcastTaskStatus.FAILED, time.time(),
+                 self.retry_max_seconds, self.retry_base_seconds, task.job_id, task.uuid),
+            )
+
+    def _get_job(self, job_id: str) -> Optional[PodcastJob]:
+        with self._lock:
+            db = self._db()
+            job = db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if job is None:
+                return None
+            rows = db.execute("SELECT * FROM job_items WHERE job_id = ? ORDER BY created_at", (job_id,)).fetchall()
+
+        tasks = [self._row_to_task(row) for row in rows]
+        statuses = {task.status for task in tasks}
+        if statuses & {PodcastTaskStatus.PENDING, PodcastTaskStatus.RUNNING}:
+            status = PodcastTaskStatus.RUNNING
+        elif PodcastTaskStatus.FAILED in statuses:
+            status = PodcastTaskStatus.FAILED
+        else:
+            status = PodcastTaskStatus.SUCCEEDED
+        return PodcastJob(id=job_id, status=status, created_at=datetime.fromisoformat(job["created_at"]), items=tasks)
+
+    def _blocked_uuids(self) -> Set[str]:
+        with self._lock:
+            rows = self._db().execute(
+                "SELECT uuid FROM job_items AS j"
+                " WHERE (status IN (?, ?) OR (status = ? AND (attempt >= ? OR retry_after > ?)))"
+                " AND NOT EXISTS (SELECT 1 FROM job_items WHERE uuid = j.uuid AND created_at > j.created_at)",
+                (*ACTIVE_STATUSES, PodcastTaskStatus.FAILED.value, self.max_attempts, time.time()),
+            ).fetchall()
+        return {row["uuid"] for row in rows}
+
+    def _has_orphans(self) -> bool:
+        with self._lock:
+            row = self._db().execute(
+                f"SELECT 1 FROM job_items WHERE {_ORPHANED} LIMIT 1",
+                (*ACTIVE_STATUSES, self.owner, time.time()),
+            ).fetchone()
+        return row is not None
+
+    def _claim_orphans(self) -> List[Tuple[PodcastTask, PerplexityFeedItem]]:
+        claimed: List[Tuple[PodcastTask, PerplexityFeedItem]] = []
+        with self._lock:
+            db = self._db()
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                rows = db.execute(
+                    f"SELECT * FROM job_items WHERE {_ORPHANED}",
+                    (*ACTIVE_STATUSES, self.owner, now),
+                ).fetchall()
+                for row in rows:
+                    db.execute(
+                        "UPDATE job_items SET owner = ?, status = ?, lease_expires = ? WHERE job_id = ? AND uuid = ?",
+                        (self.owner, PodcastTaskStatus.PENDING.value, lease_expiry(self.lease_seconds),
+                         row["job_id"], row["uuid"]),
+                    )
+                    task = self._row_to_task(row)
+                    task.status = PodcastTaskStatus.PENDING
+                    claimed.append((task, PerplexityFeedItem.model_validate_json(row["item"])))
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+        return claimed
+
+    @staticmethod
+    def _row_to_task(row: Any) -> PodcastTask:
+        return PodcastTask(
+            job_id=row["job_id"],
+            uuid=row["uuid"],
+            status=PodcastTaskStatus(row["status"]),
+            stage=row["stage"],
+            s3_url=row["s3_url"],
+            error=row["error"],
+            timings=json.loads(row["timings"] or "{}"),
+            created_at=datetime.fromisoformat(row["created_at"]),
+            finished_at=datetime.fromisoformat(row["finished_at"]) if row["finished_at"] else None,
+        )
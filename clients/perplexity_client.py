@@ -1,14 +1,43 @@
 import asyncio
 import json
-from typing import Any, Dict, List
+import logging
+import os
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional
 
-import undetected_chromedriver as uc
+import aiohttp
+from yarl import URL
+
+from clients.browser_pool import BrowserPool
 from models.perplexity import PerplexityFeedItem
+from utils.metrics import time_call
+
+
+class CloudflareChallengeError(RuntimeError):
+    """Raised when the HTTP fast path is answered with a challenge instead of JSON."""
 
 
 class PerplexityClient:
 
     BASE_URL: str = "https://www.perplexity.ai/rest/discover/feed"
+    HOME_URL: str = "https://www.perplexity.ai/"
+
+    def __init__(self) -> None:
+        self.pool = BrowserPool(
+            factory=self._create_driver,
+            warm_url=self.HOME_URL,
+            size=int(os.environ.get('PERPLEXITY_BROWSER_POOL_SIZE', '2')),
+            max_uses=int(os.environ.get('PERPLEXITY_BROWSER_MAX_REQUESTS', '50')),
+            max_age_seconds=float(os.environ.get('PERPLEXITY_BROWSER_MAX_AGE_MINUTES', '30')) * 60,
+        )
+        # "http": browser only harvests clearance, pages go over aiohttp.
+        # "browser": every page is fetched from inside Chrome.
+        self.fetch_mode = os.environ.get('PERPLEXITY_FETCH_MODE', 'http')
+        self.page_concurrency = int(os.environ.get('PERPLEXITY_PAGE_CONCURRENCY', '4'))
+        self.http_timeout = float(os.environ.get('PERPLEXITY_HTTP_TIMEOUT', '30'))
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._clearance_at: float = 0.0
+        self._clearance_lock = asyncio.Lock()
 
     async def get_feed(
         self,
@@ -20,8 +49,17 @@ class PerplexityClient:
     ) -> Dict[str, Any]:
         """Return the raw JSON response from the feed endpoint."""
         url = self._build_url(limit, offset, version, topic, source)
-        loop = asyncio.get_running_loop()
-        return await loop.run_in_executor(None, self._selenium_fetch, url)
+        if self.fetch_mode == "http":
+            try:
+                return await self._http_fetch(url)
+            except CloudflareChallengeError:
+                logging.info("Perplexity fast path challenged, refreshing clearance")
+            await self._refresh_clearance(force=True)
+            try:
+                return await self._http_fetch(url)
+            except CloudflareChallengeError:
+                logging.warning("Perplexity fast path still challenged, falling back to browser")
+        return await self._browser_fetch(url)
 
     async def get_feed_items(
         self,
@@ -30,10 +68,52 @@ class PerplexityClient:
         version: str = "2.18",
         topic: str = "top",
         source: str = "default",
+        pages: int = 1,
     ) -> List[PerplexityFeedItem]:
-        """Parse the feed into strongly-typed ``PerplexityFeedItem`` objects."""
-        feed_json = await self.get_feed(limit, offset, version, topic, source)
-        return [PerplexityFeedItem.from_json(json_data=i) for i in feed_json["items"]]
+        """
+        Parse the feed into strongly-typed ``PerplexityFeedItem`` objects.
+
+        With ``pages > 1`` the following ``pages - 1`` offsets are fetched
+        concurrently (bounded by ``PERPLEXITY_PAGE_CONCURRENCY``) and merged
+        in feed order, so a deep backfill takes a single call.
+        """
+        semaphore = asyncio.Semaphore(self.page_concurrency)
+
+        async def fetch_page(page_offset: int) -> List[Dict[str, Any]]:
+            async with semaphore:
+                feed_json = await self.get_feed(limit, page_offset, version, topic, source)
+                return feed_json.get("items", [])
+
+        offsets = [offset + page * limit for page in range(max(pages, 1))]
+        page_results = await asyncio.gather(*(fetch_page(o) for o in offsets))
+
+        raw_page: List[Dict[str, Any]] = []
+        seen: set = set()
+        for raw_items in page_results:
+            for raw in raw_items:
+                uuid = raw.get("uuid", "")
+                if uuid in seen:
+                    continue  # the feed shifts while we page; drop repeats
+                seen.add(uuid)
+                raw_page.append(raw)
+        items = PerplexityFeedItem.from_json_page(raw_page)
+        return items
+
+    async def close(self) -> None:
+        """Close the HTTP session and quit all pooled browsers."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        await self.pool.close()
+
+    @classmethod
+    async def lifecycle(cls) -> AsyncIterator["PerplexityClient"]:
+        """Async generator for ``providers.Resource``: the pool lives as long as the app."""
+        client = cls()
+        try:
+            yield client
+        finally:
+            await client.close()
 
     # ------------------------------------------------------------------
     # Internals – all kept private to avoid leaking Selenium details
@@ -47,8 +127,74 @@ class PerplexityClient:
             f"&topic={topic}&source={source}"
         )
 
-    def _create_driver(self) -> "uc.Chrome":
+    async def _browser_fetch(self, url: str) -> Dict[str, Any]:
+        with time_call("perplexity", "browser_fetch"):
+            async with self.pool.acquire() as pooled:
+                return await self.pool.run(self._selenium_fetch, pooled.driver, url)
+
+    async def _http_fetch(self, url: str) -> Dict[str, Any]:
+        """Fetch ``url`` over the pooled aiohttp session using harvested clearance."""
+        if self._session is None:
+            await self._refresh_clearance()
+        assert self._session is not None
+
+        with time_call("perplexity", "http_fetch"):
+            async with self._session.get(url) as response:
+                body = await response.text()
+                if self._is_challenge(response, body):
+                    raise CloudflareChallengeError(f"Challenge response ({response.status}) for {url}")
+                response.raise_for_status()
+
+        try:
+            return json.loads(body)
+        except json.JSONDecodeError:
+            raise CloudflareChallengeError(f"Non-JSON response for {url}: {body[:300]!r}") from None
+
+    async def _refresh_clearance(self, force: bool = False) -> None:
+        """
+        Harvest Cloudflare cookies and the user agent from a pooled browser.
+
+        Concurrent callers that hit a challenge at the same time share one
+        refresh: anyone arriving within a few seconds of the last one reuses it.
+        """
+        async with self._clearance_lock:
+            if self._session is not None and (not force or time.monotonic() - self._clearance_at < 5):
+                return
+
+            async with self.pool.acquire() as pooled:
+                await self.pool.run(pooled.driver.get, self.HOME_URL)
+                cookies = await self.pool.refresh_cookies(pooled)
+                user_agent: str = await self.pool.run(
+                    pooled.driver.execute_script, "return navigator.userAgent"
+                )
+
+            if self._session is None:
+                self._session = aiohttp.ClientSession(
+                    connector=aiohttp.TCPConnector(limit=self.page_concurrency * 2, ttl_dns_cache=300),
+                    timeout=aiohttp.ClientTimeout(total=self.http_timeout),
+                    headers={"Accept": "application/json", "Referer": self.HOME_URL},
+                )
+            self._session.headers["User-Agent"] = user_agent
+            self._session.cookie_jar.update_cookies(
+                {cookie["name"]: cookie["value"] for cookie in cookies},
+                response_url=URL(self.HOME_URL),
+            )
+            self._clearance_at = time.monotonic()
+            logging.info(f"Refreshed Perplexity clearance ({len(cookies)} cookies)")
+
+    @staticmethod
+    def _is_challenge(response: aiohttp.ClientResponse, body: str) -> bool:
+        if response.status in (403, 503):
+            return True
+        if response.headers.get("cf-mitigated") == "challenge":
+            return True
+        return "text/html" in response.headers.get("Content-Type", "") and "Just a moment" in body
+
+    def _create_driver(self) -> Any:
         """Spin up an undetected Chrome instance with sensible defaults."""
+        # Selenium/uc are only needed when the browser fallback actually launches
+        import undetected_chromedriver as uc
+
         options = uc.ChromeOptions()
         options.headless = False
         options.add_argument("--no-sandbox")
@@ -56,32 +202,33 @@ class PerplexityClient:
         options.add_argument("--disable-blink-features=AutomationControlled")
         return uc.Chrome(version_main=138, options=options)
 
-    def _selenium_fetch(self, url: str) -> Dict[str, Any]:
-        """Run inside a thread pool: launches Chrome, hits the endpoint & returns JSON."""
-        driver = self._create_driver()
-        try:
-            # Initial page load ensures Cloudflare cookies are set.
-            driver.get("https://www.perplexity.ai/")
-            js = """
-                return (async () => {
-                    const response = await fetch(arguments[0], { credentials: 'include' });
-                    return await response.text();
-                })();
-            """
-            raw_result: str = driver.execute_script(js, url)
+    @staticmethod
+    def _selenium_fetch(driver: Any, url: str) -> Dict[str, Any]:
+        """Run on the browser pool: fetch the endpoint from a warm page & return JSON."""
+        # The pooled driver already sits on perplexity.ai with Cloudflare cookies set.
+        js = """
+            return (async () => {
+                const response = await fetch(arguments[0], { credentials: 'include' });
+                return await response.text();
+            })();
+        """
+        raw_result: str = driver.execute_script(js, url)
 
-            try:
-                return json.loads(raw_result)
-            except json.JSONDecodeError:
-                snippet = raw_result[:300].replace("\n", " ")
-                raise RuntimeError(
-                    f"Failed to parse Selenium response. First 300 chars: {snippet}"
-                ) from None
-        finally:
-            driver.quit()
+        try:
+            return json.loads(raw_result)
+        except json.JSONDecodeError:
+            snippet = raw_result[:300].replace("\n", " ")
+            raise RuntimeError(
+                f"Failed to parse Selenium response. First 300 chars: {snippet}"
+            ) from None
 
 
 if __name__ == "__main__":
-    client = PerplexityClient()  # Visible browser for CAPTCHA workaround
-    raw_feed = asyncio.run(client.get_feed_items(limit=10))
-    print(raw_feed)
+    async def main() -> None:
+        client = PerplexityClient()  # Visible browser for CAPTCHA workaround
+        try:
+            print(await client.get_feed_items(limit=10))
+        finally:
+            await client.close()
+
+    asyncio.run(main())
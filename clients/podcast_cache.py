@@ -0,0 +1,85 @@
+import asyncio
+import hashlib
+import json
+import os
+from typing import NamedTuple, Optional
+
+from clients.s3_client import S3Client
+from models.perplexity import PerplexityFeedItem
+from models.podcast import PodcastConfig
+from utils.disk_cache import DiskLRUCache
+
+# Per-run fields that don't change what gets generated (the source text is
+# hashed from the item itself)
+_CONFIG_RUN_FIELDS = {"urls", "text", "image_paths", "transcript_file", "output_dir"}
+
+
+class CacheHit(NamedTuple):
+    audio_path: Optional[str] = None
+    transcript_path: Optional[str] = None
+    s3_url: Optional[str] = None
+
+
+class PodcastCache:
+    """
+    Content-addressed cache of generated podcasts.
+
+    Entries are keyed on a hash of the rendered source (title, bullet
+    summary, images) and the generation config. The first tier is a local
+    LRU directory; when ``PODCAST_CACHE_S3_PREFIX`` is set, S3 is a second
+    tier and the cached object doubles as the published podcast, so a hit
+    there reuses its URL without uploading anything. S3 is checked first so
+    a podcast already published isn't uploaded again from the local copy.
+    """
+
+    def __init__(self, s3_client: S3Client) -> None:
+        self.s3_client = s3_client
+        self.enabled = os.environ.get('PODCAST_CACHE_ENABLED', 'true').lower() == 'true'
+        self.s3_prefix = os.environ.get('PODCAST_CACHE_S3_PREFIX') or None
+        self.local = DiskLRUCache(
+            root=os.environ.get('PODCAST_CACHE_DIR', 'data/cache/podcasts'),
+            max_bytes=int(os.environ.get('PODCAST_CACHE_MAX_MB', '2048')) * 1024 * 1024,
+        )
+
+    @staticmethod
+    def key_for(item: PerplexityFeedItem, config: PodcastConfig) -> str:
+        payload = {
+            "title": item.title,
+            "bullet_summary_preload": item.bullet_summary_preload,
+            "images": item.images or [],
+            "config": config.model_dump(mode="json", exclude=_CONFIG_RUN_FIELDS),
+        }
+        encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False).encode("utf-8")
+        return hashlib.sha256(encoded).hexdigest()
+
+    def s3_key(self, key: str) -> Optional[str]:
+        """Object key to publish under when the S3 tier is enabled."""
+        return f"{self.s3_prefix.rstrip('/')}/{key}.mp3" if self.s3_prefix else None
+
+    async def lookup(self, key: str, dest_dir: str) -> Optional[CacheHit]:
+        """
+        Find a cached podcast, published S3 copy first.
+
+        A local hit is copied into ``dest_dir`` so a concurrent ``store``
+        can't evict it while the caller is still using it.
+        """
+        if not self.enabled:
+            return None
+
+        s3_key = self.s3_key(key)
+        if s3_key and await self.s3_client.exists(s3_key):
+            return CacheHit(s3_url=self.s3_client.url_for(s3_key))
+
+        audio_path = await asyncio.to_thread(self.local.copy_out, f"{key}.mp3", os.path.join(dest_dir, f"{key}.mp3"))
+        if audio_path:
+            transcript_path = await asyncio.to_thread(
+                self.local.copy_out, f"{key}.txt", os.path.join(dest_dir, f"{key}.txt"))
+            return CacheHit(audio_path=audio_path, transcript_path=transcript_path)
+        return None
+
+    async def store(self, key: str, audio_path: str, transcript_path: Optional[str] = None) -> None:
+        if not self.enabled:
+            return
+        await asyncio.to_thread(self.local.put, f"{key}.mp3", audio_path)
+        if transcript_path:
+            await asyncio.to_thread(self.local.put, f"{key}.txt", transcript_path)
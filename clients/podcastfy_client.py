@@ -1,23 +1,177 @@
 import asyncio
-from podcastfy.client import generate_podcast
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, AsyncIterator, Dict
 from models.podcast import PodcastConfig, ConversationConfig
 
+
+def _warm_worker() -> None:
+    """Process initializer: pay podcastfy's (heavy) import once per worker, not per job."""
+    import podcastfy.client  # noqa: F401
+
+
+def _run_podcastfy(kwargs: Dict[str, Any]) -> str:
+    """Runs inside a worker; only paths cross the process boundary."""
+    from podcastfy.client import generate_podcast
+    return generate_podcast(**kwargs)
+
+
+class _Worker:
+    """A single-process executor, so one hung job can be killed without touching the others."""
+
+    def __init__(self, context: Any) -> None:
+        self.executor = ProcessPoolExecutor(max_workers=1, mp_context=context, initializer=_warm_worker)
+
+    def kill(self) -> None:
+        # ProcessPoolExecutor can't cancel a running job; terminate its only process instead
+        for process in list((getattr(self.executor, "_processes", None) or {}).values()):
+            process.kill()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+class _WorkerPool:
+    """Fixed set of ``_Worker``s handed out first come, first served."""
+
+    def __init__(self, context: Any, size: int) -> None:
+        self.context = context
+        self.workers = [_Worker(context) for _ in range(max(1, size))]
+        self.idle: "asyncio.Queue[_Worker]" = asyncio.Queue()
+        for worker in self.workers:
+            self.idle.put_nowait(worker)
+
+    def replace(self, worker: _Worker) -> _Worker:
+        worker.kill()
+        fresh = _Worker(self.context)
+        self.workers = [fresh if w is worker else w for w in self.workers]
+        return fresh
+
+    def kill(self) -> None:
+        for worker in self.workers:
+            worker.kill()
+        self.workers.clear()
+
+
 class PodcastClient:
-    """Client for generating podcasts"""
-    
+    """
+    Client for generating podcasts.
+
+    podcastfy is synchronous and CPU-heavy in places (pydub concatenation and
+    encoding), so it runs in spawned worker processes rather than on threads
+    sharing the event loop's GIL. Transcript and TTS jobs get separate pools,
+    ``PODCAST_TRANSCRIPT_WORKERS`` and ``PODCAST_TTS_WORKERS`` (defaulting to
+    their stage limits), so a backlog of one stage never waits behind the
+    other. Each job gets ``PODCAST_JOB_TIMEOUT_SECONDS``; a job that times out
+    (or is cancelled) has its worker killed and replaced.
+    ``PODCAST_EXECUTOR=thread`` restores the old in-process behaviour.
+    """
+
+    def __init__(self) -> None:
+        transcript_limit = os.environ.get('PODCAST_TRANSCRIPT_CONCURRENCY', '8')
+        self.pool_sizes = {
+            "transcript": int(os.environ.get('PODCAST_TRANSCRIPT_WORKERS', transcript_limit)),
+            "tts": int(os.environ.get('PODCAST_TTS_WORKERS', os.environ.get('TTS_CONCURRENCY', '2'))),
+        }
+        self.timeout = float(os.environ.get('PODCAST_JOB_TIMEOUT_SECONDS', '1800'))
+        self.use_processes = os.environ.get('PODCAST_EXECUTOR', 'process') != 'thread'
+        # Spawn, not fork: the parent runs grpc/aiohttp threads that don't survive a fork
+        self._context = multiprocessing.get_context("spawn")
+        self._pools: Dict[str, _WorkerPool] = {}
+
+    async def start(self) -> None:
+        """Spawn and warm the worker processes up front instead of on the first job."""
+        if not self.use_processes:
+            return
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(
+            loop.run_in_executor(worker.executor, _warm_worker)
+            for stage in self.pool_sizes for worker in self._pool(stage).workers
+        ))
+
+    def close(self) -> None:
+        # In-flight jobs were drained by the service; anything left would block interpreter exit
+        for pool in self._pools.values():
+            pool.kill()
+        self._pools.clear()
+
+    @classmethod
+    async def lifecycle(cls) -> AsyncIterator["PodcastClient"]:
+        """Async generator for ``providers.Resource``."""
+        client = cls()
+        await client.start()
+        try:
+            yield client
+        finally:
+            client.close()
+
     async def generate_podcast(self, config: PodcastConfig) -> str:
-        conversation_config = config.conversation_config.model_dump() if config.conversation_config else None
-        
-        # Generate podcast using sync function in async context
-        audio_file = await asyncio.to_thread(generate_podcast,
-            urls=config.urls,
-            tts_model=config.tts_model,
-            conversation_config=conversation_config,
-            transcript_only=config.transcript_only,
-            image_paths=config.image_paths
+        # A full run starts with the LLM, so it queues with transcripts
+        return await self._run("transcript", config)
+
+    async def generate_transcript(self, config: PodcastConfig) -> str:
+        """Run only the LLM half and return the saved transcript path."""
+        return await self._run("transcript", config.model_copy(update={"transcript_only": True}))
+
+    async def synthesize(self, config: PodcastConfig, transcript_file: str) -> str:
+        """Run only the TTS half from a saved transcript and return the audio path."""
+        return await self._run(
+            "tts", config.model_copy(update={"transcript_file": transcript_file, "transcript_only": False})
         )
-        
-        return audio_file
+
+    async def _run(self, stage: str, config: PodcastConfig) -> str:
+        kwargs = self._podcastfy_kwargs(config)
+        if not self.use_processes:
+            return await asyncio.to_thread(_run_podcastfy, kwargs)
+
+        pool = self._pool(stage)
+        worker = await pool.idle.get()
+        loop = asyncio.get_running_loop()
+        try:
+            return await asyncio.wait_for(
+                loop.run_in_executor(worker.executor, _run_podcastfy, kwargs), self.timeout
+            )
+        except asyncio.TimeoutError:
+            worker = pool.replace(worker)
+            raise TimeoutError(f"podcastfy job exceeded {self.timeout:.0f}s; worker replaced")
+        except (asyncio.CancelledError, BrokenProcessPool):
+            # The worker is either still busy with an abandoned job or already dead
+            worker = pool.replace(worker)
+            raise
+        finally:
+            pool.idle.put_nowait(worker)
+
+    def _pool(self, stage: str) -> _WorkerPool:
+        if stage not in self._pools:
+            self._pools[stage] = _WorkerPool(self._context, self.pool_sizes[stage])
+        return self._pools[stage]
+
+    @staticmethod
+    def _podcastfy_kwargs(config: PodcastConfig) -> Dict[str, Any]:
+        conversation_config = config.conversation_config.model_dump() if config.conversation_config else None
+        if config.output_dir:
+            # Keep this run's transcript and audio out of the shared data/ dirs
+            conversation_config = conversation_config or {}
+            conversation_config.setdefault("text_to_speech", {})["output_directories"] = {
+                "transcripts": os.path.join(config.output_dir, "transcripts"),
+                "audio": os.path.join(config.output_dir, "audio"),
+            }
+
+        if config.transcript_file:
+            # Sources were already consumed by the transcript stage
+            return {
+                "transcript_file": config.transcript_file,
+                "tts_model": config.tts_model,
+                "conversation_config": conversation_config,
+            }
+        return {
+            "urls": config.urls or None,
+            "text": config.text,
+            "tts_model": config.tts_model,
+            "conversation_config": conversation_config,
+            "transcript_only": config.transcript_only,
+            "image_paths": config.image_paths,
+        }
 
 # Example usage
 if __name__ == "__main__":
@@ -34,8 +188,12 @@ if __name__ == "__main__":
         )
     )
     
-    # Generate podcast
-    client = PodcastClient()
-    audio_file = asyncio.run(client.generate_podcast(config))
-    
-    print(f"✅ Podcast generated successfully: {audio_file}") 
\ No newline at end of file
+    async def main() -> None:
+        client = PodcastClient()
+        try:
+            audio_file = await client.generate_podcast(config)
+        finally:
+            client.close()
+        print(f"✅ Podcast generated successfully: {audio_file}")
+
+    asyncio.run(main())
@@ -1,33 +1,180 @@
 import asyncio
-from typing import Optional, ByteString
-from langsmith import traceable
+import os
+from typing import Any, AsyncIterator, Dict, List, Optional, ByteString
+from utils.tracing import traceable
 from clients.aws_base_client import AWSBaseClient
 
+MB = 1024 * 1024
+
+
+async def _file_chunks(file_path: str, chunk_size: int) -> AsyncIterator[bytes]:
+    """Read ``file_path`` in ``chunk_size`` pieces without blocking the event loop."""
+    f = await asyncio.to_thread(open, file_path, 'rb')
+    try:
+        while True:
+            chunk = await asyncio.to_thread(f.read, chunk_size)
+            if not chunk:
+                return
+            yield chunk
+    finally:
+        f.close()
+
+
+async def _rechunk(chunks: AsyncIterator[bytes], part_size: int) -> AsyncIterator[bytes]:
+    """Regroup an arbitrary byte stream into ``part_size`` parts (the last may be short)."""
+    buffer = bytearray()
+    async for chunk in chunks:
+        buffer.extend(chunk)
+        while len(buffer) >= part_size:
+            yield bytes(buffer[:part_size])
+            del buffer[:part_size]
+    if buffer:
+        yield bytes(buffer)
+
+
 class S3Client(AWSBaseClient):
+    clients = ('s3',)
+
+    def __init__(self) -> None:
+        super().__init__()
+        # S3 requires parts of at least 5 MB (except the last one)
+        self.part_size = max(5, int(os.environ.get('S3_MULTIPART_PART_SIZE_MB', '8'))) * MB
+        self.multipart_concurrency = int(os.environ.get('S3_MULTIPART_CONCURRENCY', '4'))
+        self.multipart_threshold = int(os.environ.get('S3_MULTIPART_THRESHOLD_MB', '16')) * MB
 
     @traceable(name="upload_file")
     async def upload_file(self, file_content: ByteString, 
                          key: str, content_type: str = 'application/octet-stream', bucket_name: str = 'reyy-ai') -> Optional[str]:
         try:
-            async with self.session.client('s3') as s3:
-                await s3.put_object(
-                    Bucket=bucket_name,
-                    Key=key,
-                    Body=file_content,
-                    ContentType=content_type
-                )
+            s3 = await self.client('s3')
+            await s3.put_object(
+                Bucket=bucket_name,
+                Key=key,
+                Body=file_content,
+                ContentType=content_type
+            )
             
-            s3_url: str = f"https://{bucket_name}.s3.amazonaws.com/{key}"
-            return s3_url
+            return self.url_for(key, bucket_name)
             
         except Exception as e:
             print(f"Error uploading to S3: {e}")
             return None   
 
+    @traceable(name="upload_path")
+    async def upload_path(self, file_path: str, key: str, content_type: str = 'application/octet-stream',
+                          bucket_name: str = 'reyy-ai') -> Optional[str]:
+        """Upload a file from disk, streaming it as a multipart upload when it is large."""
+        size = await asyncio.to_thread(os.path.getsize, file_path)
+        if size <= self.multipart_threshold:
+            file_content = await asyncio.to_thread(self._read_file, file_path)
+            return await self.upload_file(file_content, key, content_type, bucket_name)
+        return await self.upload_stream(_file_chunks(file_path, self.part_size), key, content_type, bucket_name)
+
+    async def upload_stream(self, chunks: AsyncIterator[bytes], key: str,
+                            content_type: str = 'application/octet-stream',
+                            bucket_name: str = 'reyy-ai') -> Optional[str]:
+        """
+        Upload an async byte stream with parallel multipart upload.
+
+        At most ``S3_MULTIPART_CONCURRENCY`` parts are in flight and one more
+        is buffered, so memory stays around part_size x concurrency however
+        long the stream is. Each part carries a SHA-256 checksum. On any
+        failure the multipart upload is aborted so no orphaned parts are
+        billed. A stream that fits in one part is sent as a single PUT,
+        whatever the multipart threshold.
+        """
+        parts_iter = _rechunk(chunks, self.part_size).__aiter__()
+        first = await anext(parts_iter, None)
+        second = await anext(parts_iter, None) if first is not None else None
+        if first is None or second is None:
+            return await self.upload_file(first or b"", key, content_type, bucket_name)
+
+        s3 = await self.client('s3')
+        upload_id: Optional[str] = None
+        tasks: List[asyncio.Task] = []
+        try:
+            created = await s3.create_multipart_upload(
+                Bucket=bucket_name, Key=key, ContentType=content_type, ChecksumAlgorithm='SHA256'
+            )
+            upload_id = created['UploadId']
+            slots = asyncio.Semaphore(self.multipart_concurrency)
+
+            async def upload_part(part_number: int, body: bytes) -> Dict[str, Any]:
+                try:
+                    resp = await s3.upload_part(
+                        Bucket=bucket_name, Key=key, UploadId=upload_id, PartNumber=part_number,
+                        Body=body, ChecksumAlgorithm='SHA256'
+                    )
+                    part = {'PartNumber': part_number, 'ETag': resp['ETag']}
+                    if resp.get('ChecksumSHA256'):
+                        part['ChecksumSHA256'] = resp['ChecksumSHA256']
+                    return part
+                finally:
+                    slots.release()
+
+            async def all_parts() -> AsyncIterator[bytes]:
+                yield first
+                yield second
+                async for part in parts_iter:
+                    yield part
+
+            part_number = 0
+            async for body in all_parts():
+                # Backpressure: don't read the next part until a slot frees up
+                await slots.acquire()
+                failed = next((t for t in tasks if t.done() and t.exception()), None)
+                if failed is not None:
+                    slots.release()
+                    raise failed.exception()
+                part_number += 1
+                tasks.append(asyncio.create_task(upload_part(part_number, body)))
+
+            parts = await asyncio.gather(*tasks)
+            await s3.complete_multipart_upload(
+                Bucket=bucket_name, Key=key, UploadId=upload_id,
+                MultipartUpload={'Parts': sorted(parts, key=lambda p: p['PartNumber'])}
+            )
+            return self.url_for(key, bucket_name)
+
+        except Exception as e:
+            print(f"Error in multipart upload to S3: {e}")
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            if upload_id is not None:
+                try:
+                    await s3.abort_multipart_upload(Bucket=bucket_name, Key=key, UploadId=upload_id)
+                except Exception as abort_error:
+                    print(f"Error aborting multipart upload {upload_id}: {abort_error}")
+            return None
+
+    @staticmethod
+    def _read_file(file_path: str) -> bytes:
+        with open(file_path, 'rb') as f:
+            return f.read()
+
+    async def exists(self, key: str, bucket_name: str = 'reyy-ai') -> bool:
+        try:
+            s3 = await self.client('s3')
+            await s3.head_object(Bucket=bucket_name, Key=key)
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def url_for(key: str, bucket_name: str = 'reyy-ai') -> str:
+        return f"https://{bucket_name}.s3.amazonaws.com/{key}"
+
 
 if __name__ == "__main__":
-    client = S3Client()
-    audio_path = 'data/audio/podcast_205a2e5de4ea494dba9df5c8ecebe9e4.mp3'
-    with open(audio_path, 'rb') as f:  # Changed 'r' to 'rb' for binary read mode
-        file_content = f.read()
-    print(asyncio.run(client.upload_file(file_content=file_content, key=audio_path)))
\ No newline at end of file
+    async def main() -> None:
+        client = S3Client()
+        audio_path = 'data/audio/podcast_205a2e5de4ea494dba9df5c8ecebe9e4.mp3'
+        with open(audio_path, 'rb') as f:  # Changed 'r' to 'rb' for binary read mode
+            file_content = f.read()
+        try:
+            print(await client.upload_file(file_content=file_content, key=audio_path))
+        finally:
+            await client.close()
+
+    asyncio.run(main())
@@ -5,31 +5,69 @@ from clients.s3_client import S3Client
 from clients.dynamodb_client import DynamoDBClient
 from clients.gemini_client import GeminiClient
 from clients.podcastfy_client import PodcastClient
+from clients.job_store import JobStore
+from clients.image_cache import ImageCache
+from clients.podcast_cache import PodcastCache
 from services.podcast_service import PodcastService
+from services.tts_scheduler import TTSScheduler
+from utils.pdf import PdfRenderer
+from utils.workspace import WorkspaceManager
 from services.preplexity_service import PerplexityService
+from services.feed_service import FeedService
 
 class ServicesContainer(containers.DeclarativeContainer):
     """Dependency Injection Container"""
     
     # Clients
-    perplexity_client = providers.Singleton(
-        PerplexityClient
+    perplexity_client = providers.Resource(
+        PerplexityClient.lifecycle
     )
     
-    s3_client = providers.Singleton(
-        S3Client
+    # AWS clients hold pooled connections: opened on startup via
+    # ``init_resources()`` and closed by ``shutdown_resources()``.
+    s3_client = providers.Resource(
+        S3Client.lifecycle
     )
     
-    dynamodb_client = providers.Singleton(
-        DynamoDBClient
+    dynamodb_client = providers.Resource(
+        DynamoDBClient.lifecycle
     )
     
-    gemini_client = providers.Singleton(
-        GeminiClient
+    gemini_client = providers.Resource(
+        GeminiClient.lifecycle
     )
     
-    podcast_client = providers.Singleton(
-        PodcastClient
+    # Owns the podcastfy worker processes, spawned and warmed on startup
+    podcast_client = providers.Resource(
+        PodcastClient.lifecycle
+    )
+
+    job_store = providers.Resource(
+        JobStore.lifecycle
+    )
+
+    podcast_cache = providers.Singleton(
+        PodcastCache,
+        s3_client=s3_client,
+    )
+
+    tts_scheduler = providers.Singleton(
+        TTSScheduler,
+        podcast_client=podcast_client,
+    )
+
+    # Downscaled local copies of item images for podcastfy
+    image_cache = providers.Resource(
+        ImageCache.lifecycle
+    )
+
+    pdf_renderer = providers.Resource(
+        PdfRenderer.lifecycle
+    )
+
+    # Per-job scratch dirs; the resource also runs the orphan janitor
+    workspaces = providers.Resource(
+        WorkspaceManager.lifecycle
     )
 
     podcast_service = providers.Singleton(
@@ -38,10 +76,22 @@ class ServicesContainer(containers.DeclarativeContainer):
         dynamo_db_client=dynamodb_client,
         s3_client=s3_client,
         gemini_client=gemini_client,
+        job_store=job_store,
+        podcast_cache=podcast_cache,
+        tts_scheduler=tts_scheduler,
+        pdf_renderer=pdf_renderer,
+        image_cache=image_cache,
+        workspaces=workspaces,
     )
 
     perplexity_service = providers.Singleton(
         PerplexityService,
         perplexity_client=perplexity_client,
         dynamo_db_client=dynamodb_client
-    )
\ No newline at end of file
+    )
+
+    # Read API; flushes its page cache on writes through dynamodb_client
+    feed_service = providers.Singleton(
+        FeedService,
+        dynamo_db_client=dynamodb_client,
+    )
@@ -5,5 +5,12 @@ set -e
 Xvfb :99 -screen 0 "${XVFB_WHD:-1920x1080x24}" &
 export DISPLAY=:99
 
+# "serve" is the production server: gunicorn with WEB_CONCURRENCY uvicorn workers.
+# exec keeps gunicorn as the signal target so SIGTERM drains in-flight jobs.
+if [ "$1" = "serve" ]; then
+    shift
+    set -- gunicorn -c gunicorn_conf.py "$@" main:app
+fi
+
 # Hand over to whatever CMD the image received
 exec "$@"
@@ -0,0 +1,46 @@
+"""
+Production server settings: ``gunicorn -c gunicorn_conf.py main:app``.
+
+Runs WEB_CONCURRENCY uvicorn workers (one event loop per core by default).
+Every provider is resolved lazily inside the worker, after the fork: no
+aioboto3 session, aiohttp connector, grpc channel or thread exists when
+the master imports the app, so ``preload_app`` is fork-safe and lets the
+workers share the already-imported modules.
+"""
+import os
+import tempfile
+
+from utils.runtime import configure_runtime
+
+# Before anything else reads settings or imports grpc
+configure_runtime()
+
+# Workers write metrics to files here and /metrics merges them; it must be
+# set before prometheus_client is imported, and start empty (a fresh dir
+# per master unless one is given).
+if not os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+    os.environ['PROMETHEUS_MULTIPROC_DIR'] = tempfile.mkdtemp(prefix="reyy-ai-metrics-")
+
+bind = f"{os.environ.get('API_HOST', '0.0.0.0')}:{os.environ.get('API_PORT', '8000')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', str(os.cpu_count() or 1)))
+worker_class = "utils.server.UvicornWorker"
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'true').lower() == 'true'
+
+# SIGTERM -> lifespan shutdown drains in-flight podcast items for up to
+# PODCAST_DRAIN_TIMEOUT_SECONDS, so keep this comfortably above it.
+graceful_timeout = int(os.environ.get('GRACEFUL_TIMEOUT', '120'))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '120'))
+keepalive = int(os.environ.get('KEEP_ALIVE', '5'))
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', '0'))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', '0'))
+
+accesslog = "-"
+errorlog = "-"
+loglevel = os.environ.get('LOG_LEVEL', 'info')
+
+
+def child_exit(server, worker) -> None:
+    # Drop the dead worker's live gauges (in-flight items, queue depths)
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
@@ -1,31 +1,121 @@
 #!/usr/bin/env python3
 
+import asyncio
+import logging
 import os
-# Add gRPC fork safety configuration
-os.environ["GRPC_ENABLE_FORK_SUPPORT"] = "true"
-os.environ["GRPC_POLL_STRATEGY"] = "poll"
-from typing import Dict, Any
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Any, Optional
+
+from utils.runtime import configure_runtime
+
+# Load .env and environment defaults before anything reads settings
+configure_runtime()
+
+from fastapi import Depends, FastAPI, Header, HTTPException, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
-import uvicorn
-from dotenv import load_dotenv
 
+from clients.job_store import JobStore
 from container import ServicesContainer
+from models.podcast import PodcastJob
+from services.feed_service import FeedService, InvalidCursorError
+from services.ingestion_scheduler import IngestionScheduler
 from services.podcast_service import PodcastService
 from services.preplexity_service import PerplexityService
+from utils import metrics
+
+# Initialize DI container. Providers are resolved on first use, so a worker
+# that only ever serves the feed endpoint never starts the podcast stack.
+container = ServicesContainer()
+# Set once the podcast stack has been started, so shutdown knows to drain it
+podcast_service: Optional[PodcastService] = None
+
+
+async def get_perplexity_service() -> PerplexityService:
+    return await container.perplexity_service()
+
+
+async def get_feed_service() -> FeedService:
+    return await container.feed_service()
+
+
+async def get_podcast_service() -> PodcastService:
+    global podcast_service
+    podcast_service = await container.podcast_service()
+    return podcast_service
+
+
+async def get_job_store() -> JobStore:
+    return await container.job_store()
 
-# Initialize LangSmith
-from langsmith import Client
-langsmith_client = Client()
 
-# Load environment variables
-load_dotenv()
+async def resume_podcasts() -> None:
+    """
+    Restart items orphaned by other processes, off the startup path.
+
+    Runs once on startup and then once per job lease, since items left by a
+    process that died moments ago only become claimable when its lease lapses.
+    Only the job store is opened to look; the podcast stack is started the
+    first time there is something to resume.
+    """
+    interval = float(os.environ.get('JOB_LEASE_SECONDS', '60'))
+    while True:
+        try:
+            job_store = await get_job_store()
+            if await job_store.has_orphans():
+                podcast_service = await get_podcast_service()
+                resumed = await podcast_service.resume()
+                if resumed:
+                    logging.info(f"Resumed {resumed} orphaned podcast items")
+        except Exception as e:
+            logging.error(f"Resuming orphaned podcast items failed: {e!r}")
+        await asyncio.sleep(interval)
+
+
+async def start_scheduler() -> IngestionScheduler:
+    scheduler = IngestionScheduler(
+        perplexity_service=await get_perplexity_service(),
+        dynamo_db_client=await container.dynamodb_client(),
+        get_podcast_service=get_podcast_service,
+    )
+    await scheduler.start()
+    return scheduler
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Start serving right away; release whatever providers were initialized on shutdown."""
+    resume: Optional[asyncio.Task] = None
+    if os.environ.get('PODCAST_RESUME_ON_STARTUP', 'true').lower() == 'true':
+        resume = asyncio.create_task(resume_podcasts(), name="resume-podcasts")
+    scheduler: Optional[IngestionScheduler] = None
+    if os.environ.get('INGEST_ENABLED', 'false').lower() == 'true':
+        scheduler = await start_scheduler()
+    try:
+        yield
+    finally:
+        if resume is not None:
+            resume.cancel()
+        if scheduler is not None:
+            # Before draining, so no new items are queued behind the drain
+            await scheduler.stop()
+        if podcast_service is not None and podcast_service.in_flight():
+            # Keep below the server's graceful timeout (GRACEFUL_TIMEOUT for gunicorn)
+            timeout = float(os.environ.get('PODCAST_DRAIN_TIMEOUT_SECONDS', '100'))
+            logging.info(f"Draining {podcast_service.in_flight()} in-flight podcast items")
+            cancelled = await podcast_service.drain(timeout=timeout)
+            if cancelled:
+                logging.warning(f"Left {cancelled} podcast items to be resumed by the next process")
+        # Returns None when no async resource was ever initialized
+        shutdown = container.shutdown_resources()
+        if shutdown is not None:
+            await shutdown
 
 # Initialize FastAPI app
 app = FastAPI(
     title="Reyy AI API",
     description="API for fetching Perplexity data and generating podcasts",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -37,29 +127,86 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize DI container
-container = ServicesContainer()
-perplexity_service : PerplexityService = container.perplexity_service()
-podcast_service : PodcastService = container.podcast_service()
 @app.get("/")
 def read_root() -> Dict[str, str]:
     return {"message": "Reyy AI API is running"}
 
+@app.get("/metrics")
+def get_metrics() -> Response:
+    """Prometheus scrape endpoint (all workers' values under gunicorn)."""
+    data, content_type = metrics.render()
+    return Response(content=data, media_type=content_type)
+
+@app.get("/feed")
+async def get_feed(
+    limit: Optional[int] = Query(default=None, ge=1, le=100),
+    cursor: Optional[str] = None,
+    if_none_match: Optional[str] = Header(default=None),
+    feed_service: FeedService = Depends(get_feed_service),
+) -> Response:
+    """Newest feed items first; pass ``next_cursor`` back as ``cursor`` for the next page."""
+    try:
+        page, etag = await feed_service.get_page(limit, cursor, if_none_match)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    # Clients may keep the page but must revalidate it (a cheap 304 when unchanged)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if page is None:
+        return Response(status_code=304, headers=headers)
+    return Response(content=page.body, media_type="application/json", headers=headers)
+
 @app.post("/get-and-save-feed")
-async def get_and_save_feed() -> Dict[str, Any]:
+async def get_and_save_feed(
+    perplexity_service: PerplexityService = Depends(get_perplexity_service),
+) -> Dict[str, Any]:
     num_items_saved, feed_items = await perplexity_service.get_and_save_feed(limit=20, offset=0)
     return {"message": "Feed saved successfully", "num_items_saved": num_items_saved, "feed_items": feed_items}
 
+@app.post("/sync-feed")
+async def sync_feed(
+    topic: Optional[str] = None,
+    perplexity_service: PerplexityService = Depends(get_perplexity_service),
+) -> Dict[str, Any]:
+    result = await perplexity_service.sync_feed(topic)
+    return {
+        "message": "Feed synced successfully",
+        "topic": result.topic,
+        "pages": result.pages,
+        "reached_watermark": result.reached_watermark,
+        "num_items_saved": result.saved,
+        "feed_items": result.items,
+    }
+
 @app.post("/generate-podcast")
-async def generate_podcast() -> Dict[str, Any]:
-    items_length = await podcast_service.generate_podcast()
-    return {"message": "Podcast generated successfully for " + str(items_length) + " items"}
+async def generate_podcast(podcast_service: PodcastService = Depends(get_podcast_service)) -> Dict[str, Any]:
+    job = await podcast_service.generate_podcast()
+    if job is None:
+        return {"message": "Podcast generation queued for 0 items", "job_id": None}
+    return {"message": "Podcast generation queued for " + str(len(job.items)) + " items", "job_id": job.id}
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str, job_store: JobStore = Depends(get_job_store)) -> PodcastJob:
+    job = await job_store.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job
 
 def start() -> None:
+    import uvicorn
+
     host: str = os.environ.get('API_HOST', '0.0.0.0')
     port: int = int(os.environ.get('API_PORT', '8000'))
-    
-    uvicorn.run("main:app", host=host, port=port, reload=True)
+    # Development entry point; production runs gunicorn with gunicorn_conf.py
+    reload: bool = os.environ.get('API_RELOAD', 'true').lower() == 'true'
+
+    uvicorn.run(
+        "main:app",
+        host=host,
+        port=port,
+        reload=reload,
+        loop=os.environ.get('UVICORN_LOOP', 'auto'),
+        http=os.environ.get('UVICORN_HTTP', 'auto'),
+    )
 
 if __name__ == "__main__":
     start()
\ No newline at end of file
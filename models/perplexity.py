@@ -1,6 +1,9 @@
+from dataclasses import dataclass
 from datetime import datetime
 from typing import List, Optional, Dict, Any
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, TypeAdapter
+
+from utils.text import normalize_text
 
 class PerplexityFeedItem(BaseModel):
     """Model for a Perplexity feed item"""
@@ -16,24 +19,82 @@ class PerplexityFeedItem(BaseModel):
     
     @classmethod
     def from_json(cls, json_data: Dict[str, Any]) -> "PerplexityFeedItem":
-        
+        return cls(**cls._fields_from_json(json_data))
+
+    @classmethod
+    def from_json_page(cls, items: List[Dict[str, Any]]) -> List["PerplexityFeedItem"]:
+        """Validate a whole page of raw feed JSON in one pass."""
+        return FEED_ITEMS_ADAPTER.validate_python([cls._fields_from_json(i) for i in items])
+
+    @staticmethod
+    def dump_many(items: List["PerplexityFeedItem"]) -> List[Dict[str, Any]]:
+        """``model_dump`` for a whole list in one call."""
+        return FEED_ITEMS_ADAPTER.dump_python(items)
+
+    @staticmethod
+    def _fields_from_json(json_data: Dict[str, Any]) -> Dict[str, Any]:
         images = []
-        last_query_datetime = json_data.get("last_query_datetime")
         if json_data.get("featured_images") and len(json_data["featured_images"]) > 0:
             for image in json_data["featured_images"]:
                 image_url = image.get("image")
                 if image_url:
                     images.append(image_url)
-            
-        return cls(
+
+        # Normalized once on the way in so everything stored is clean UTF-8
+        return dict(
             uuid=json_data.get("uuid", ""),
             slug=json_data.get("slug", ""),
-            title=json_data.get("title", ""),
-            summary=json_data.get("summary", ""),
-            first_answer=json_data.get("first_answer", ""),
-            description=json_data.get("description", ""),
-            bullet_summary_preload=json_data.get("bullet_summary_preload", ""),
+            title=normalize_text(json_data.get("title", ""), encoding="utf-8"),
+            summary=normalize_text(json_data.get("summary", ""), encoding="utf-8"),
+            first_answer=normalize_text(json_data.get("first_answer", ""), encoding="utf-8"),
+            description=normalize_text(json_data.get("description", ""), encoding="utf-8"),
+            bullet_summary_preload=normalize_text(json_data.get("bullet_summary_preload", ""), encoding="utf-8"),
             images=images,
-            last_query_datetime=last_query_datetime
+            last_query_datetime=json_data.get("last_query_datetime")
+        )
+
+
+FEED_ITEMS_ADAPTER = TypeAdapter(List[PerplexityFeedItem])
+
+
+@dataclass(slots=True)
+class FeedItemRecord:
+    """Lightweight, unvalidated view of a stored feed item for bulk scan passes"""
+    uuid: str
+    slug: str = ""
+    title: str = ""
+    summary: str = ""
+    first_answer: str = ""
+    description: str = ""
+    bullet_summary_preload: str = ""
+    images: Optional[List[str]] = None
+    last_query_datetime: Optional[str] = None
+    s3_url: Optional[str] = None
+
+    @classmethod
+    def from_row(cls, row: Dict[str, Any]) -> "FeedItemRecord":
+        return cls(
+            uuid=row["uuid"],
+            slug=row.get("slug", ""),
+            title=row.get("title", ""),
+            summary=row.get("summary", ""),
+            first_answer=row.get("first_answer", ""),
+            description=row.get("description", ""),
+            bullet_summary_preload=row.get("bullet_summary_preload", ""),
+            images=row.get("images"),
+            last_query_datetime=row.get("last_query_datetime"),
+            s3_url=row.get("s3_url"),
+        )
+
+    def to_model(self) -> PerplexityFeedItem:
+        return PerplexityFeedItem(
+            uuid=self.uuid,
+            slug=self.slug,
+            title=self.title,
+            summary=self.summary,
+            first_answer=self.first_answer,
+            description=self.description,
+            bullet_summary_preload=self.bullet_summary_preload,
+            images=self.images,
+            last_query_datetime=self.last_query_datetime,
         )
- 
\ No newline at end of file
@@ -1,4 +1,6 @@
-from typing import List, Optional
+from datetime import datetime
+from enum import Enum
+from typing import Dict, List, Optional
 from pydantic import BaseModel, Field
 
 class TTSVoiceConfig(BaseModel):
@@ -79,6 +81,10 @@ class PodcastConfig(BaseModel):
         default_factory=list,
         description="List of URLs to generate podcast content from"
     )
+    text: Optional[str] = Field(
+        default=None,
+        description="Raw text to generate podcast content from, instead of or alongside urls"
+    )
 
     # TTS configuration
     tts_model: Optional[str] = Field(
@@ -98,7 +104,39 @@ class PodcastConfig(BaseModel):
         default=None,
         description="List of image paths to include in the podcast"
     )
+    output_dir: Optional[str] = Field(
+        default=None,
+        description="Directory for the generated transcript and audio; defaults to podcastfy's data/ dirs"
+    )
     conversation_config: Optional[ConversationConfig] = Field(
         default=ConversationConfig(),
         description="Conversation configuration"
-    )
\ No newline at end of file
+    )
+
+
+class PodcastTaskStatus(str, Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class PodcastTask(BaseModel):
+    """Status of a single feed item moving through the podcast pipeline"""
+    job_id: str = Field(description="Job that queued the item")
+    uuid: str = Field(description="UUID of the feed item being processed")
+    status: PodcastTaskStatus = Field(default=PodcastTaskStatus.PENDING, description="Current status")
+    stage: Optional[str] = Field(default=None, description="Pipeline stage currently or last running")
+    s3_url: Optional[str] = Field(default=None, description="S3 URL of the uploaded podcast")
+    error: Optional[str] = Field(default=None, description="Error message if the item failed")
+    timings: Dict[str, float] = Field(default_factory=dict, description="Seconds spent in each finished stage")
+    created_at: datetime = Field(default_factory=datetime.now, description="When the item was queued")
+    finished_at: Optional[datetime] = Field(default=None, description="When the item finished")
+
+
+class PodcastJob(BaseModel):
+    """A batch of items queued by one /generate-podcast trigger"""
+    id: str = Field(description="Job identifier")
+    status: PodcastTaskStatus = Field(description="Aggregate status across the job's items")
+    created_at: datetime = Field(description="When the job was created")
+    items: List[PodcastTask] = Field(default_factory=list, description="Per-item status")
@@ -0,0 +1,128 @@
+import asyncio
+import base64
+import binascii
+import hashlib
+import json
+import os
+from dataclasses import asdict
+from datetime import datetime
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+from clients.dynamodb_client import DynamoDBClient
+from models.perplexity import FeedItemRecord
+from utils.memory_cache import TTLLRUCache
+from utils.metrics import FEED_CACHE_INVALIDATIONS, FEED_CACHE_LOOKUPS
+
+
+class InvalidCursorError(ValueError):
+    """Raised for a ``cursor`` that wasn't issued by ``GET /feed``."""
+
+
+class FeedPage(NamedTuple):
+    body: bytes
+    etag: str
+
+
+def encode_cursor(cursor: Optional[Dict[str, Any]]) -> Optional[str]:
+    if cursor is None:
+        return None
+    raw = json.dumps(cursor, separators=(",", ":"), sort_keys=True).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: Optional[str]) -> Optional[Dict[str, Any]]:
+    if not token:
+        return None
+    try:
+        cursor = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+    except (binascii.Error, ValueError) as e:
+        raise InvalidCursorError(f"Invalid cursor: {token}") from e
+    try:
+        datetime.strptime(cursor["day"], "%Y-%m-%d")
+        if not isinstance(cursor.get("key", {}), dict):
+            raise TypeError
+    except (KeyError, TypeError, ValueError) as e:
+        raise InvalidCursorError(f"Invalid cursor: {token}") from e
+    return cursor
+
+
+class FeedService:
+    """
+    Read side of the feed: cursor-paginated pages for ``GET /feed``.
+
+    Pages are cached already serialized, with their ETag, in a TTL+LRU map,
+    so repeat reads (and 304 revalidations) never touch DynamoDB or the
+    models. Writes through this process's ``DynamoDBClient`` flush the
+    cache; writes made by other workers show up within
+    ``FEED_CACHE_TTL_SECONDS``.
+    """
+
+    def __init__(self, dynamo_db_client: DynamoDBClient) -> None:
+        self.dynamo_db_client = dynamo_db_client
+        self.default_limit = int(os.environ.get('FEED_PAGE_SIZE', '20'))
+        self.lookback_days = int(os.environ.get('FEED_LOOKBACK_DAYS', '30'))
+        self.cache: TTLLRUCache[FeedPage] = TTLLRUCache(
+            max_entries=int(os.environ.get('FEED_CACHE_MAX_PAGES', '256')),
+            ttl_seconds=float(os.environ.get('FEED_CACHE_TTL_SECONDS', '30')),
+        )
+        # Concurrent misses for the same page share one query
+        self._loading: Dict[Tuple[int, Optional[str]], asyncio.Future] = {}
+        # Bumped on every flush so a query that started before a write isn't cached
+        self._generation = 0
+        dynamo_db_client.add_write_listener(self.invalidate)
+
+    def invalidate(self) -> None:
+        self._generation += 1
+        self._loading.clear()
+        if len(self.cache):
+            self.cache.clear()
+            FEED_CACHE_INVALIDATIONS.inc()
+
+    async def get_page(self, limit: Optional[int] = None, cursor: Optional[str] = None,
+                       if_none_match: Optional[str] = None) -> Tuple[Optional[FeedPage], str]:
+        """
+        Return ``(page, etag)`` for one page; ``page`` is None when ``if_none_match`` still matches.
+
+        Raises ``InvalidCursorError`` for a cursor this API didn't issue.
+        """
+        key = (limit or self.default_limit, cursor)
+        cached = self.cache.get(key)
+        page = cached or await self._load(key)
+        not_modified = etag_matches(if_none_match, page.etag)
+        FEED_CACHE_LOOKUPS.labels("miss" if cached is None else "not_modified" if not_modified else "hit").inc()
+        return (None if not_modified else page), page.etag
+
+    async def _load(self, key: Tuple[int, Optional[str]]) -> FeedPage:
+        loading = self._loading.get(key)
+        if loading is None:
+            loading = asyncio.ensure_future(self._query(key, self._generation))
+            self._loading[key] = loading
+
+            def forget(done: asyncio.Future) -> None:
+                if self._loading.get(key) is done:
+                    del self._loading[key]
+
+            loading.add_done_callback(forget)
+        return await asyncio.shield(loading)
+
+    async def _query(self, key: Tuple[int, Optional[str]], generation: int) -> FeedPage:
+        limit, token = key
+        rows, next_cursor = await self.dynamo_db_client.feed_page(limit, decode_cursor(token), self.lookback_days)
+        payload = {
+            "items": [asdict(FeedItemRecord.from_row(row)) for row in rows],
+            "next_cursor": encode_cursor(next_cursor),
+        }
+        body = json.dumps(payload, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+        page = FeedPage(body=body, etag=f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"')
+        if generation == self._generation:
+            self.cache.put(key, page)
+        return page
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """``If-None-Match`` check with weak comparison, as HTTP specifies for it."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
@@ -0,0 +1,154 @@
+import asyncio
+import logging
+import os
+import random
+from typing import Awaitable, Callable, List, Optional, Set
+
+from clients.dynamodb_client import DynamoDBClient
+from services.podcast_service import PodcastService
+from services.preplexity_service import PerplexityService
+from utils.lease import process_owner
+from utils.metrics import INGEST_DEFERRED, INGEST_ITEMS, INGEST_LEADER, INGEST_RUNS
+logging.basicConfig(level=logging.INFO)
+
+LEASE_NAME = "ingestion"
+
+
+class IngestionScheduler:
+    """
+    Periodic feed ingestion and podcast generation, run inside the API process.
+
+    Every topic in ``INGEST_TOPICS`` is synced on its own loop, every
+    ``INGEST_INTERVAL_<TOPIC>`` (fallback ``INGEST_INTERVAL_SECONDS``) with
+    ``INGEST_JITTER`` spread so replicas and topics don't fire in lockstep.
+    Only the holder of a DynamoDB lease does any work, so running it in
+    every worker and replica is safe. Syncs that save items wake the
+    generation loop, which holds off while ``INGEST_MAX_IN_FLIGHT`` podcast
+    items are already running; the pending items wait in DynamoDB.
+    """
+
+    def __init__(self, perplexity_service: PerplexityService, dynamo_db_client: DynamoDBClient,
+                 get_podcast_service: Callable[[], Awaitable[PodcastService]]) -> None:
+        self.perplexity_service = perplexity_service
+        self.dynamo_db_client = dynamo_db_client
+        # Resolved on first use, so only the leader starts the podcast stack
+        self.get_podcast_service = get_podcast_service
+
+        self.topics: List[str] = [
+            topic.strip() for topic in os.environ.get('INGEST_TOPICS', 'top').split(',') if topic.strip()
+        ]
+        self.default_interval = float(os.environ.get('INGEST_INTERVAL_SECONDS', '900'))
+        self.jitter = float(os.environ.get('INGEST_JITTER', '0.1'))
+        self.lease_seconds = int(os.environ.get('INGEST_LEASE_SECONDS', '60'))
+        self.generate = os.environ.get('INGEST_GENERATE', 'true').lower() == 'true'
+        self.max_in_flight = int(os.environ.get('INGEST_MAX_IN_FLIGHT', '20'))
+        self.backpressure_poll = float(os.environ.get('INGEST_BACKPRESSURE_POLL_SECONDS', '15'))
+
+        self.owner = process_owner()
+        self._leader = asyncio.Event()
+        self._wake_generation = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+
+    def interval(self, topic: str) -> float:
+        return float(os.environ.get(f'INGEST_INTERVAL_{topic.upper()}', self.default_interval))
+
+    def is_leader(self) -> bool:
+        return self._leader.is_set()
+
+    async def start(self) -> None:
+        self._tasks.append(asyncio.create_task(self._run_lease(), name="ingest-lease"))
+        for topic in self.topics:
+            self._tasks.append(asyncio.create_task(self._run_topic(topic), name=f"ingest-{topic}"))
+        if self.generate:
+            self._tasks.append(asyncio.create_task(self._run_generation(), name="ingest-generation"))
+        logging.info(f"Ingestion scheduler started for topics {self.topics} as {self.owner}")
+
+    async def stop(self) -> None:
+        """Stop the loops (a sync or generation round in progress is cancelled) and hand back the lease."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+        if self.is_leader():
+            self._set_leader(False)
+            await self.dynamo_db_client.release_lease(LEASE_NAME, self.owner)
+
+    # ------------------------------------------------------------------
+    # Leadership
+    # ------------------------------------------------------------------
+    async def _run_lease(self) -> None:
+        # Renew well inside the TTL so one slow call doesn't drop the lease
+        renew_every = max(1.0, self.lease_seconds / 3)
+        while True:
+            held = await self.dynamo_db_client.acquire_lease(LEASE_NAME, self.owner, self.lease_seconds)
+            if held != self.is_leader():
+                logging.info(f"Ingestion lease {'acquired' if held else 'lost'} by {self.owner}")
+                self._set_leader(held)
+                if held:
+                    # Pick up whatever the previous leader left pending
+                    self._wake_generation.set()
+            await asyncio.sleep(renew_every)
+
+    def _set_leader(self, leader: bool) -> None:
+        if leader:
+            self._leader.set()
+            INGEST_LEADER.set(1)
+        else:
+            self._leader.clear()
+            INGEST_LEADER.set(0)
+
+    # ------------------------------------------------------------------
+    # Feed sync
+    # ------------------------------------------------------------------
+    async def _run_topic(self, topic: str) -> None:
+        interval = self.interval(topic)
+        # Random first offset spreads the topics out from the start
+        await asyncio.sleep(random.uniform(0, interval * self.jitter))
+        while True:
+            await self._leader.wait()
+            await self._sync(topic)
+            await asyncio.sleep(interval * random.uniform(1 - self.jitter, 1 + self.jitter))
+
+    async def _sync(self, topic: str) -> None:
+        try:
+            result = await self.perplexity_service.sync_feed(topic)
+        except Exception as e:
+            INGEST_RUNS.labels(topic, "error").inc()
+            logging.error(f"Scheduled sync of {topic} failed: {e!r}")
+            return
+        INGEST_RUNS.labels(topic, "ok").inc()
+        INGEST_ITEMS.labels(topic).inc(result.saved)
+        if result.saved:
+            self._wake_generation.set()
+
+    # ------------------------------------------------------------------
+    # Podcast generation
+    # ------------------------------------------------------------------
+    async def _run_generation(self) -> None:
+        while True:
+            await self._wake_generation.wait()
+            self._wake_generation.clear()
+            try:
+                await self._generate_pending()
+            except Exception as e:
+                logging.error(f"Scheduled podcast generation failed: {e!r}")
+
+    async def _generate_pending(self) -> None:
+        """Queue pending items batch by batch while leader and below the backlog limit."""
+        podcast_service: Optional[PodcastService] = None
+        # Queued this round; an item that fails fast waits for the next wake
+        # instead of being requeued in a tight loop
+        queued: Set[str] = set()
+        while self.is_leader():
+            if podcast_service is None:
+                podcast_service = await self.get_podcast_service()
+            if podcast_service.in_flight() >= self.max_in_flight:
+                INGEST_DEFERRED.inc()
+                logging.info(f"Podcast backlog at {podcast_service.in_flight()} items; deferring generation")
+                await asyncio.sleep(self.backpressure_poll)
+                continue
+            room = self.max_in_flight - podcast_service.in_flight()
+            job = await podcast_service.generate_podcast(exclude=queued, limit=min(room, podcast_service.batch_size))
+            if job is None:
+                return  # nothing pending that isn't already running or backing off
+            queued.update(task.uuid for task in job.items)
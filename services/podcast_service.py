@@ -1,101 +1,286 @@
+from contextlib import aclosing, asynccontextmanager
 from datetime import datetime, timedelta
 import os
+import time
 import asyncio
-from typing import List
-from langsmith import traceable
+from typing import AsyncIterator, Dict, List, Optional, Set
+from utils.tracing import traceable
 from clients.dynamodb_client import DynamoDBClient
 from clients.gemini_client import GeminiClient
+from clients.image_cache import ImageCache
+from clients.job_store import JobStore
+from clients.podcast_cache import PodcastCache
 from clients.podcastfy_client import PodcastClient
 from clients.s3_client import S3Client
+from services.tts_scheduler import TTSScheduler
 from models.perplexity import PerplexityFeedItem
-from models.podcast import PodcastConfig
-from utils.common import delete_transcripts, delete_audio_files, delete_pdf_responses
-from utils.pdf import save_item_as_pdf
+from models.podcast import PodcastConfig, PodcastJob, PodcastTask, PodcastTaskStatus
+from utils.metrics import (
+    ITEMS_IN_FLIGHT, ITEMS_PROCESSED, STAGE_IN_PROGRESS, STAGE_SECONDS, STAGE_WAIT_SECONDS, STAGE_WAITING,
+)
+from utils.pdf import PdfRenderer
+from utils.text import normalize_text
+from utils.workspace import Workspace, WorkspaceManager
 import logging
 logging.basicConfig(level=logging.INFO)
 
+# Default number of items allowed in each pipeline stage at once
+# ("tts" is limited per model by TTSScheduler instead)
+STAGE_CONCURRENCY: Dict[str, int] = {
+    "pdf": 4,
+    "images": 8,
+    "transcript": 8,
+    "upload": 4,
+    "db": 8,
+}
+
+# How far a pending-index read may lag behind the item's DynamoDB update
+PENDING_INDEX_LAG_SECONDS = 10
+
 class PodcastService:
     def __init__(self, podcast_client: PodcastClient, dynamo_db_client: DynamoDBClient, s3_client: S3Client,\
-                  gemini_client: GeminiClient):
+                  gemini_client: GeminiClient, job_store: JobStore, podcast_cache: PodcastCache,\
+                  tts_scheduler: TTSScheduler, pdf_renderer: PdfRenderer, image_cache: ImageCache,\
+                  workspaces: WorkspaceManager):
         
         self.podcast_client = podcast_client
         self.dynamo_db_client = dynamo_db_client
         self.s3_client = s3_client
         self.gemini_client = gemini_client
+        self.job_store = job_store
+        self.podcast_cache = podcast_cache
+        self.tts_scheduler = tts_scheduler
+        self.pdf_renderer = pdf_renderer
+        self.image_cache = image_cache
+        self.workspaces = workspaces
+
+        self.batch_size = int(os.environ.get('PODCAST_BATCH_SIZE', '10'))
+        # "text" hands the item text straight to podcastfy; "pdf" renders a PDF first
+        self.source_mode = os.environ.get('PODCAST_SOURCE_MODE', 'text')
+        self._stage_limits: Dict[str, asyncio.Semaphore] = {
+            stage: asyncio.Semaphore(int(os.environ.get(f'PODCAST_{stage.upper()}_CONCURRENCY', str(default))))
+            for stage, default in STAGE_CONCURRENCY.items()
+        }
+        self._running: Set[asyncio.Task] = set()
 
-    #this will get all items from dynamo db and generate a podcast for each item with cutoff date 1 day ago
+    #this will get pending items from dynamo db and queue a podcast job for them
     @traceable(name="generate_podcast")
-    async def generate_podcast(self) -> int:
-        try:
-            delete_transcripts()
-            delete_audio_files()
-            delete_pdf_responses()
-        except Exception as e:
-            raise e
+    async def generate_podcast(self, exclude: Optional[Set[str]] = None, limit: Optional[int] = None) -> Optional[PodcastJob]:
+        """
+        Queue a job for the next ``limit`` (default ``batch_size``) pending items.
 
-        items: List[PerplexityFeedItem] = await self.dynamo_db_client.scan(limit=2, blank_s3_only=True)
+        Items already active in a job keep their ``pending`` flag until they
+        finish, as do failed ones backing off or out of attempts, so the
+        pending index is paged past them (and past ``exclude``) rather than
+        handing the same batch back. Returns None when nothing was queued.
+        """
+        # The pending index is eventually consistent, so an item finished
+        # shortly before the read can still show up as pending
+        read_at = datetime.now() - timedelta(seconds=PENDING_INDEX_LAG_SECONDS)
+        skip = await self.job_store.blocked_uuids() | (exclude or set())
+        items: List[PerplexityFeedItem] = []
+        async with aclosing(self.dynamo_db_client.query_pending()) as pending:
+            async for item in pending:
+                if item.uuid in skip:
+                    continue
+                items.append(item)
+                if len(items) >= (limit or self.batch_size):
+                    break
 
         logging.info(f"Found {len(items)} items to process.")
-        # Process items in parallel
-        for item in items:
-            asyncio.create_task(self._process_item(item))
-            logging.info(f"Started processing item: {item.uuid}")
-        return len(items)
-    
+        # The store skips items another job took or finished since the read
+        job_id, tasks = await self.job_store.create_job(items, read_at)
+        if job_id is None:
+            logging.info("No items queued")
+            return None
+        by_uuid = {item.uuid: item for item in items}
+        for task in tasks:
+            self._start(task, by_uuid[task.uuid])
+            logging.info(f"Started processing item: {task.uuid}")
+        logging.info(f"Job {job_id} queued {len(tasks)} of {len(items)} items")
+        return await self.get_job(job_id)
+
+    async def get_job(self, job_id: str) -> Optional[PodcastJob]:
+        return await self.job_store.get_job(job_id)
+
+    async def resume(self) -> int:
+        """Restart items left incomplete by a process that is no longer running."""
+        claimed = await self.job_store.claim_orphans()
+        for task, item in claimed:
+            self._start(task, item)
+            logging.info(f"Resumed item {item.uuid} from job {task.job_id}")
+        return len(claimed)
+
+    def in_flight(self) -> int:
+        return len(self._running)
+
+    async def drain(self, timeout: Optional[float] = None) -> int:
+        """
+        Wait for in-flight items to finish (used on shutdown).
+
+        Items still running after ``timeout`` are cancelled; they stay active
+        in the job store and are resumed by the next process. Returns how
+        many were cancelled.
+        """
+        if not self._running:
+            return 0
+        _, pending = await asyncio.wait(set(self._running), timeout=timeout)
+        for running in pending:
+            running.cancel()
+        if pending:
+            await asyncio.wait(pending)
+        return len(pending)
+
+    # ------------------------------------------------------------------
+    # Task tracking
+    # ------------------------------------------------------------------
+    def _start(self, task: PodcastTask, item: PerplexityFeedItem) -> None:
+        running = asyncio.create_task(self._process_item(task, item), name=f"podcast-{item.uuid}")
+        # Hold a reference until done so the task can't be garbage-collected
+        self._running.add(running)
+        ITEMS_IN_FLIGHT.inc()
+        running.add_done_callback(self._on_task_done)
+
+    def _on_task_done(self, running: asyncio.Task) -> None:
+        self._running.discard(running)
+        ITEMS_IN_FLIGHT.dec()
+        if not running.cancelled() and running.exception() is not None:
+            logging.error(f"{running.get_name()} failed: {running.exception()!r}")
+
+    @asynccontextmanager
+    async def _stage(self, stage: str, task: PodcastTask) -> AsyncIterator[None]:
+        limit = self._stage_limits.get(stage)
+        if limit is not None:
+            queued = time.monotonic()
+            with STAGE_WAITING.labels(stage).track_inprogress():
+                await limit.acquire()
+            STAGE_WAIT_SECONDS.labels(stage).observe(time.monotonic() - queued)
+        try:
+            with STAGE_IN_PROGRESS.labels(stage).track_inprogress():
+                task.status = PodcastTaskStatus.RUNNING
+                task.stage = stage
+                await self.job_store.save_task(task)
+                started = time.monotonic()
+                try:
+                    yield
+                finally:
+                    elapsed = time.monotonic() - started
+                    task.timings[stage] = round(elapsed, 3)
+                    STAGE_SECONDS.labels(stage).observe(elapsed)
+        finally:
+            if limit is not None:
+                limit.release()
+
+    # ------------------------------------------------------------------
+    # Pipeline
+    # ------------------------------------------------------------------
     @traceable(name="process_podcast_item")
-    async def _process_item(self, item: PerplexityFeedItem) -> None:
+    async def _process_item(self, task: PodcastTask, item: PerplexityFeedItem) -> None:
         """Process a single feed item to generate and upload a podcast."""
-        pdf_path = audio_path = None
+        # Every item gets its own workspace so cleanup never touches other runs
+        workspace = await asyncio.to_thread(self.workspaces.create, task.job_id, item.uuid)
         try:
-            # Create PDF from item
-            pdf_path = await self._create_pdf(item)
+            config = self._podcast_config(item, workspace.path)
+            cache_key = self.podcast_cache.key_for(item, config)
+            hit = await self.podcast_cache.lookup(cache_key, workspace.path)
+            s3_url = hit.s3_url if hit else None
+
+            if s3_url:
+                # Already published under the cache prefix; just point the item at it
+                logging.info(f"Reusing cached S3 podcast for item: {item.uuid}")
+            else:
+                if hit and hit.audio_path:
+                    audio_path = hit.audio_path
+                    logging.info(f"Reusing cached audio for item: {item.uuid}")
+                else:
+                    if self.source_mode == "pdf":
+                        # Create PDF from item
+                        async with self._stage("pdf", task):
+                            pdf_path = await self._create_pdf(item, workspace)
+                        source_config = config.model_copy(update={"urls": [pdf_path]})
 
-            logging.info(f"Created PDF for item: {item.uuid}")
+                        logging.info(f"Created PDF for item: {item.uuid}")
+                    else:
+                        source_config = config.model_copy(update={"text": self._item_text(item)})
 
-            # Generate podcast audio
-            audio_path = await self._generate_audio(item, pdf_path)
+                    if item.images:
+                        # Local, downscaled copies instead of full-size remote URLs
+                        async with self._stage("images", task):
+                            image_paths = await self.image_cache.fetch_many(item.images)
+                        source_config = source_config.model_copy(update={"image_paths": image_paths})
 
-            logging.info(f"Generated audio for item: {item.uuid}")
+                    # LLM and TTS run as separate stages with their own limits
+                    async with self._stage("transcript", task):
+                        transcript_path = workspace.track(await self._generate_transcript(source_config))
 
-            # Upload to S3 and get URL
-            s3_url = await self._upload_to_s3(audio_path)
+                    logging.info(f"Generated transcript for item: {item.uuid}")
 
-            logging.info(f"Uploaded audio to S3 for item: {item.uuid}")
+                    async with self._stage("tts", task):
+                        audio_path = workspace.track(await self._synthesize(config, transcript_path))
+                    await self.podcast_cache.store(cache_key, audio_path, transcript_path)
+
+                    logging.info(f"Generated audio for item: {item.uuid}")
+
+                # Upload to S3 and get URL
+                async with self._stage("upload", task):
+                    s3_url = await self._upload_to_s3(audio_path, self.podcast_cache.s3_key(cache_key))
+
+                logging.info(f"Uploaded audio to S3 for item: {item.uuid}")
 
             # Update item in database with S3 URL
-            await self._update_item_with_url(item.uuid, s3_url)
+            async with self._stage("db", task):
+                await self._update_item_with_url(item.uuid, s3_url)
 
             logging.info(f"Updated item in database with S3 URL for item: {item.uuid}")
+            task.status = PodcastTaskStatus.SUCCEEDED
+            task.s3_url = s3_url
 
         except Exception as e:
-            raise e
+            task.status = PodcastTaskStatus.FAILED
+            task.error = str(e)
+            raise
         finally:
-            delete_transcripts()
-            delete_audio_files()
-            delete_pdf_responses()
-            await asyncio.sleep(2)
+            if task.status in (PodcastTaskStatus.SUCCEEDED, PodcastTaskStatus.FAILED):
+                task.finished_at = datetime.now()
+                ITEMS_PROCESSED.labels(task.status.value).inc()
+            else:
+                ITEMS_PROCESSED.labels("interrupted").inc()
+            await self.job_store.save_task(task)
+            await asyncio.to_thread(self.workspaces.release, workspace)
     
     @traceable(name="create_pdf")
-    async def _create_pdf(self, item: PerplexityFeedItem) -> str:
+    async def _create_pdf(self, item: PerplexityFeedItem, workspace: Workspace) -> str:
         """Create a PDF from the feed item and return the path."""
-        pdf_path = f"responses/pdf/{item.uuid}.pdf"
-        os.makedirs(os.path.dirname(pdf_path), exist_ok=True)
-        save_item_as_pdf(item, pdf_path)
-        return pdf_path
+        pdf_path = workspace.file(f"{item.uuid}.pdf")
+        return await self.pdf_renderer.render_to_file(item, pdf_path)
     
+    @staticmethod
+    def _podcast_config(item: PerplexityFeedItem, output_dir: str) -> PodcastConfig:
+        return PodcastConfig(image_paths=item.images, output_dir=output_dir)
+
+    @staticmethod
+    def _item_text(item: PerplexityFeedItem) -> str:
+        return normalize_text(f"{item.title}\n\n{item.bullet_summary_preload}")
+
+    @traceable(name="generate_transcript")
+    async def _generate_transcript(self, config: PodcastConfig) -> str:
+        """Generate the podcast transcript from the configured source and return its path."""
+        return await self.podcast_client.generate_transcript(config)
+
     @traceable(name="generate_audio")
-    async def _generate_audio(self, item: PerplexityFeedItem, pdf_path: str) -> str:
-        """Generate podcast audio from the PDF and return the audio path."""
-        config = PodcastConfig(urls=[pdf_path], image_paths=item.images)
-        audio_path = await self.podcast_client.generate_podcast(config)
+    async def _synthesize(self, config: PodcastConfig, transcript_path: str) -> str:
+        """Synthesize audio from the saved transcript and return the audio path."""
+        audio_path = await self.tts_scheduler.synthesize(config, transcript_path)
         return audio_path
     
     @traceable(name="upload_to_s3") 
-    async def _upload_to_s3(self, file_path: str) -> str:
+    async def _upload_to_s3(self, file_path: str, key: Optional[str] = None) -> str:
         """Upload a file to S3 and return the S3 URL."""
-        with open(file_path, 'rb') as f:
-            file_content = f.read()
-            s3_url = await self.s3_client.upload_file(file_content=file_content, key=file_path)
+        # Keep the historical data/audio/<file> key layout regardless of workspace
+        key = key or f"data/audio/{os.path.basename(file_path)}"
+        s3_url = await self.s3_client.upload_path(file_path=file_path, key=key)
+        if not s3_url:
+            raise RuntimeError(f"Upload to S3 failed for {file_path}")
         return s3_url
     
     @traceable(name="update_item_with_url")
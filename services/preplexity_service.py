@@ -1,22 +1,99 @@
 import logging
-from typing import List, Tuple
-from langsmith import traceable
+import os
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Tuple
+from utils.tracing import traceable
 from clients.dynamodb_client import DynamoDBClient
 from clients.perplexity_client import PerplexityClient
 from models.perplexity import PerplexityFeedItem
 logging.basicConfig(level=logging.INFO)
 
+
+class FeedSyncResult(NamedTuple):
+    topic: str
+    pages: int
+    saved: int
+    reached_watermark: bool
+    items: List[PerplexityFeedItem]
+
+
 class PerplexityService:
     def __init__(self, perplexity_client: PerplexityClient, dynamo_db_client: DynamoDBClient):
         self.perplexity_client = perplexity_client
         self.dynamo_db_client = dynamo_db_client
 
+        self.default_topic = os.environ.get('PERPLEXITY_DEFAULT_TOPIC', 'top')
+        self.sync_page_size = int(os.environ.get('PERPLEXITY_SYNC_PAGE_SIZE', '20'))
+        # Bounds a catch-up after downtime (or a first run with no watermark)
+        self.sync_max_pages = int(os.environ.get('PERPLEXITY_SYNC_MAX_PAGES', '10'))
+        # Head-of-feed uuids remembered per topic; a window rather than one
+        # uuid so the stop still works when the newest item drops off the feed
+        self.watermark_size = int(os.environ.get('PERPLEXITY_SYNC_WATERMARK_SIZE', '200'))
+
     @traceable(name="get_and_save_feed")
     async def get_and_save_feed(self, limit: int = 20, offset: int = 0) -> Tuple[int, List[PerplexityFeedItem]]:
         logging.info(f"Getting feed items from Perplexity with limit: {limit}, offset: {offset}")
         feed_items : List[PerplexityFeedItem] = await self.perplexity_client.get_feed_items(limit, offset)
         logging.info(f"Received {len(feed_items)} feed items from Perplexity")
-        num_items_saved = await self.dynamo_db_client.put_items([item.model_dump() for item in feed_items])
+        num_items_saved = await self.dynamo_db_client.put_items(PerplexityFeedItem.dump_many(feed_items))
         logging.info(f"Saved {num_items_saved} feed items to DynamoDB")
         return num_items_saved, feed_items
     
+
+    @traceable(name="sync_feed")
+    async def sync_feed(self, topic: Optional[str] = None) -> FeedSyncResult:
+        """
+        Incremental sync: walk the feed from the top until reaching items already ingested.
+
+        Pages are fetched one at a time and the walk stops at the first page
+        containing a uuid from the topic's watermark, so a typical run fetches
+        one page and validates/writes only the unseen items. The watermark is
+        advanced only after the writes succeed.
+        """
+        topic = topic or self.default_topic
+        mark = await self.dynamo_db_client.get_watermark(topic)
+        known: Set[str] = set(mark['uuids']) if mark else set()
+
+        fresh: List[Dict[str, Any]] = []
+        seen: List[str] = []
+        seen_set: Set[str] = set()
+        reached = False
+        pages = 0
+        while pages < self.sync_max_pages and not reached:
+            offset = pages * self.sync_page_size
+            feed_json = await self.perplexity_client.get_feed(self.sync_page_size, offset, topic=topic)
+            raw_items = feed_json.get("items", [])
+            pages += 1
+            for raw in raw_items:
+                uuid = raw.get("uuid")
+                if not uuid or uuid in seen_set:
+                    continue  # the feed shifts while we page; drop repeats
+                seen_set.add(uuid)
+                seen.append(uuid)
+                if uuid in known:
+                    reached = True
+                else:
+                    fresh.append(raw)
+            if len(raw_items) < self.sync_page_size:
+                break  # end of feed
+
+        if mark and not reached:
+            logging.warning(f"Watermark for {topic} not reached within {pages} pages; older items may be missed")
+
+        # Only the delta is parsed and written; put_new_items still skips
+        # anything that exists (e.g. items re-ranked above the watermark).
+        items = PerplexityFeedItem.from_json_page(fresh)
+        saved = await self.dynamo_db_client.put_new_items(PerplexityFeedItem.dump_many(items)) if items else 0
+
+        if seen:
+            previous = mark['uuids'] if mark else []
+            uuids = list(dict.fromkeys(seen + list(previous)))[:self.watermark_size]
+            candidates = [item.last_query_datetime for item in items if item.last_query_datetime]
+            if mark and mark.get('last_query_datetime'):
+                candidates.append(mark['last_query_datetime'])
+            # ISO strings, so the lexical max is the latest; never moves backwards
+            latest = max(candidates, default=None)
+            if not await self.dynamo_db_client.put_watermark(topic, uuids, latest, mark['version'] if mark else 0):
+                logging.info(f"Watermark for {topic} was moved by a concurrent sync; leaving it")
+
+        logging.info(f"Synced {topic}: {pages} pages, {len(items)} new, {saved} saved")
+        return FeedSyncResult(topic=topic, pages=pages, saved=saved, reached_watermark=reached, items=items)
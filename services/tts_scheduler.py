@@ -0,0 +1,49 @@
+import asyncio
+import logging
+import os
+from typing import Dict, Tuple
+
+from clients.podcastfy_client import PodcastClient
+from models.podcast import PodcastConfig
+from utils.metrics import TTS_QUEUE_DEPTH
+from utils.rate_limiter import TokenBucket
+logging.basicConfig(level=logging.INFO)
+
+
+class TTSScheduler:
+    """
+    Runs TTS synthesis from saved transcripts, separately from transcript generation.
+
+    Each ``tts_model`` gets its own concurrency cap and requests-per-minute
+    bucket, read from ``TTS_CONCURRENCY_<MODEL>`` / ``TTS_RPM_<MODEL>`` with
+    ``TTS_CONCURRENCY`` / ``TTS_RPM`` as the fallback, so a slow provider
+    never holds back the LLM stage or another provider.
+    """
+
+    def __init__(self, podcast_client: PodcastClient) -> None:
+        self.podcast_client = podcast_client
+        self._limits: Dict[str, Tuple[asyncio.Semaphore, TokenBucket]] = {}
+
+    async def synthesize(self, config: PodcastConfig, transcript_file: str) -> str:
+        model = config.tts_model or "default"
+        semaphore, bucket = self._limits_for(model)
+        TTS_QUEUE_DEPTH.labels(model).inc()
+        waiting = True
+        try:
+            async with semaphore:
+                await bucket.acquire()
+                TTS_QUEUE_DEPTH.labels(model).dec()
+                waiting = False
+                logging.info(f"Synthesizing {transcript_file} with {model}")
+                return await self.podcast_client.synthesize(config, transcript_file)
+        finally:
+            if waiting:
+                TTS_QUEUE_DEPTH.labels(model).dec()
+
+    def _limits_for(self, model: str) -> Tuple[asyncio.Semaphore, TokenBucket]:
+        if model not in self._limits:
+            suffix = model.upper()
+            concurrency = int(os.environ.get(f'TTS_CONCURRENCY_{suffix}', os.environ.get('TTS_CONCURRENCY', '2')))
+            rpm = float(os.environ.get(f'TTS_RPM_{suffix}', os.environ.get('TTS_RPM', '10')))
+            self._limits[model] = (asyncio.Semaphore(concurrency), TokenBucket(rate=rpm, capacity=max(1.0, concurrency)))
+        return self._limits[model]
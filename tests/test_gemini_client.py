@@ -0,0 +1,119 @@
+"""GeminiClient against a local aiohttp stand-in for the Gemini API."""
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List
+
+import pytest
+from aiohttp import web
+
+from clients.gemini_client import GeminiClient
+from utils.rate_limiter import TokenBucket
+
+OK_BODY = {"candidates": [], "usageMetadata": {"totalTokenCount": 10}}
+
+
+class StandIn:
+    """Serves ``generateContent`` from a script of statuses and records each request."""
+
+    def __init__(self, statuses: List[int], headers: Dict[str, str]) -> None:
+        self.statuses = statuses
+        self.headers = headers
+        self.calls = 0
+        self.peers: List[Any] = []
+
+    async def handle(self, request: web.Request) -> web.Response:
+        self.peers.append(request.transport.get_extra_info("peername"))
+        status = self.statuses[min(self.calls, len(self.statuses) - 1)]
+        self.calls += 1
+        if status != 200:
+            return web.json_response({"error": {"code": status}}, status=status, headers=self.headers)
+        return web.json_response(OK_BODY)
+
+
+def run_against(statuses: List[int], scenario: Callable[[GeminiClient], Awaitable[Any]],
+                monkeypatch: pytest.MonkeyPatch) -> Any:
+    stand_in = StandIn(statuses, {"Retry-After": "0"})
+
+    async def main() -> Any:
+        app = web.Application()
+        app.router.add_post("/models/{model}", stand_in.handle)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        monkeypatch.setenv("GEMINI_BASE_URL", f"http://127.0.0.1:{port}/models")
+        monkeypatch.setenv("GEMINI_API_KEY", "test")
+        # Keep the request rate limit out of the way of the retry timings
+        monkeypatch.setenv("GEMINI_RPM", "60000")
+        client = GeminiClient()
+        try:
+            return await scenario(client)
+        finally:
+            await client.close()
+            await runner.cleanup()
+
+    return asyncio.run(main()), stand_in
+
+
+def test_retries_429_then_succeeds(monkeypatch: pytest.MonkeyPatch) -> None:
+    result, stand_in = run_against([429, 429, 200], lambda c: c.generate_content("hi"), monkeypatch)
+    assert result == OK_BODY
+    assert stand_in.calls == 3
+
+
+@pytest.mark.parametrize("status", [500, 502, 503, 504])
+def test_retries_server_errors(monkeypatch: pytest.MonkeyPatch, status: int) -> None:
+    monkeypatch.setenv("GEMINI_MAX_RETRIES", "2")
+    result, stand_in = run_against([status, 200], lambda c: c.generate_content("hi"), monkeypatch)
+    assert result == OK_BODY
+    assert stand_in.calls == 2
+
+
+def test_gives_up_after_max_retries(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("GEMINI_MAX_RETRIES", "2")
+    result, stand_in = run_against([503], lambda c: c.generate_content("hi"), monkeypatch)
+    assert result is None
+    assert stand_in.calls == 3
+
+
+def test_does_not_retry_client_errors(monkeypatch: pytest.MonkeyPatch) -> None:
+    result, stand_in = run_against([400], lambda c: c.generate_content("hi"), monkeypatch)
+    assert result is None
+    assert stand_in.calls == 1
+
+
+def test_reuses_pooled_connection(monkeypatch: pytest.MonkeyPatch) -> None:
+    async def sequential(client: GeminiClient) -> List[Any]:
+        return [await client.generate_content(f"prompt {i}") for i in range(5)]
+
+    results, stand_in = run_against([200], sequential, monkeypatch)
+    assert results == [OK_BODY] * 5
+    # Every call went over the same keep-alive connection
+    assert len(set(stand_in.peers)) == 1
+
+
+def test_rejects_prompt_over_tpm(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("GEMINI_TPM", "1000")
+    with pytest.raises(ValueError):
+        run_against([200], lambda c: c.generate_content("x" * 4000, max_tokens=100), monkeypatch)
+
+
+def test_generate_many_keeps_results_around_a_rejected_prompt(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("GEMINI_TPM", "60000")
+    prompts = ["short", "x" * 240_000, "also short"]
+    results, stand_in = run_against([200], lambda c: c.generate_many(prompts, max_tokens=100), monkeypatch)
+    assert results[0] == OK_BODY and results[2] == OK_BODY
+    assert isinstance(results[1], ValueError)
+    assert stand_in.calls == 2
+
+
+def test_token_bucket_charges_requests_above_capacity() -> None:
+    async def main() -> float:
+        # 10 tokens/s with a one-token burst: 3 tokens need two refills
+        bucket = TokenBucket(rate=600, capacity=1)
+        started = time.monotonic()
+        await bucket.acquire(3)
+        return time.monotonic() - started
+
+    assert asyncio.run(main()) >= 0.19
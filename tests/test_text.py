@@ -0,0 +1,63 @@
+"""normalize_text must always hand back text that encodes in the requested encoding."""
+import random
+
+import pytest
+
+from utils.text import normalize_text
+
+ENCODINGS = ("latin-1", "utf-8", "cp1252", "ascii")
+
+
+def random_text(rng: random.Random, length: int) -> str:
+    chars = []
+    for _ in range(length):
+        plane = rng.random()
+        if plane < 0.5:
+            chars.append(chr(rng.randint(0x20, 0x2FFF)))
+        elif plane < 0.9:
+            chars.append(chr(rng.randint(0x3000, 0xFFFF)))  # includes lone surrogates
+        else:
+            chars.append(chr(rng.randint(0x10000, 0x10FFFF)))
+    return "".join(chars)
+
+
+def fuzz_corpus(count: int = 5000, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    return [random_text(rng, rng.randint(0, 64)) for _ in range(count)]
+
+
+@pytest.mark.parametrize("encoding", ENCODINGS)
+def test_fuzzed_text_encodes_cleanly(encoding: str) -> None:
+    failures = []
+    for text in fuzz_corpus():
+        try:
+            normalize_text(text, encoding=encoding).encode(encoding)
+        except UnicodeError as e:
+            failures.append((text, str(e)))
+    assert not failures, failures[:5]
+
+
+@pytest.mark.parametrize("encoding", ENCODINGS)
+@pytest.mark.parametrize("text", [
+    "Fed’s “wait-and-see” — 4.1%–4.2% … • ¥",
+    "Zürich, Kraków, Société Générale, Ștefan Ő",
+    "日経平均 \U0001F600 \ud800 lone surrogate",
+    "ﬁligature ＡＢ fullwidth x⁻",
+])
+def test_typical_text_encodes_cleanly(text: str, encoding: str) -> None:
+    normalize_text(text, encoding=encoding).encode(encoding)
+
+
+def test_folds_typographic_punctuation() -> None:
+    assert normalize_text("“quoted” – it’s… done​") == "\"quoted\" - it's... done"
+
+
+def test_strips_accents_only_when_the_encoding_needs_it() -> None:
+    assert normalize_text("Ștefan Zürich", encoding="latin-1") == "Stefan Zürich"
+    assert normalize_text("Ștefan Zürich", encoding="ascii") == "Stefan Zurich"
+    assert normalize_text("日本", encoding="latin-1") == "??"
+
+
+def test_empty_input() -> None:
+    assert normalize_text(None) == ""
+    assert normalize_text("", encoding="ascii") == ""
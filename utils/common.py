@@ -14,6 +14,9 @@ def get_absolute_path(sub_path: str) -> str:
 def delete_files_in_dir(dir_path: str, prefix: str = "", extension: str = ""):
     """
     Deletes files in the given directory matching the prefix and extension.
+
+    Maintenance helper for the legacy shared data/ dirs; the podcast pipeline
+    cleans up through utils.workspace instead.
     """
     resolved_path = get_absolute_path(dir_path)
 
@@ -22,15 +25,19 @@ def delete_files_in_dir(dir_path: str, prefix: str = "", extension: str = ""):
         return
 
     deleted = False
-    for file in os.listdir(resolved_path):
-        if file.startswith(prefix) and file.endswith(extension):
-            file_path = os.path.join(resolved_path, file)
+    # scandir yields names without a stat per file; only matching entries are touched
+    with os.scandir(resolved_path) as it:
+        for entry in it:
+            if not (entry.name.startswith(prefix) and entry.name.endswith(extension)):
+                continue
+            if not entry.is_file(follow_symlinks=False):
+                continue
             try:
-                os.remove(file_path)
-                logging.info(f"Deleted file: {file_path}")
+                os.unlink(entry.path)
+                logging.info(f"Deleted file: {entry.path}")
                 deleted = True
             except Exception as e:
-                logging.error(f"Failed to delete {file_path}: {e}")
+                logging.error(f"Failed to delete {entry.path}: {e}")
 
     if not deleted:
         logging.info(f"No matching files to delete in: {resolved_path}")
@@ -0,0 +1,117 @@
+import logging
+import os
+import shutil
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+
+class DiskLRUCache:
+    """
+    Size-bounded directory of files, evicted least-recently-used first.
+
+    The index is rebuilt from disk (ordered by mtime) on first use, so the
+    cache survives restarts. Reads bump an entry's mtime, writes are atomic
+    (copy to a temp name, then ``os.replace``). Methods block; call them via
+    ``asyncio.to_thread`` from async code.
+    """
+
+    def __init__(self, root: str, max_bytes: int) -> None:
+        self.root = root
+        self.max_bytes = max_bytes
+        self._index: Optional["OrderedDict[str, int]"] = None
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def path_for(self, name: str) -> str:
+        return os.path.join(self.root, name)
+
+    def get(self, name: str) -> Optional[str]:
+        """Return the cached file path for ``name`` and mark it recently used."""
+        with self._lock:
+            return self._get_locked(name)
+
+    def copy_out(self, name: str, dest: str) -> Optional[str]:
+        """
+        Copy the cached file for ``name`` to ``dest`` and mark it recently used.
+
+        Unlike ``get``, the caller's copy can't be evicted from under it.
+        Hard-links when ``dest`` is on the same filesystem.
+        """
+        with self._lock:
+            path = self._get_locked(name)
+            if path is None:
+                return None
+            try:
+                os.link(path, dest)
+            except OSError:
+                shutil.copyfile(path, dest)
+            return dest
+
+    def put(self, name: str, src_path: str) -> str:
+        """Copy ``src_path`` into the cache as ``name`` and evict down to ``max_bytes``."""
+        dest, tmp = self._temp_path(name)
+        shutil.copyfile(src_path, tmp)
+        return self._commit(name, tmp, dest)
+
+    def put_bytes(self, name: str, data: bytes) -> str:
+        """Store ``data`` in the cache as ``name`` and evict down to ``max_bytes``."""
+        dest, tmp = self._temp_path(name)
+        with open(tmp, "wb") as f:
+            f.write(data)
+        return self._commit(name, tmp, dest)
+
+    def _get_locked(self, name: str) -> Optional[str]:
+        index = self._load_index()
+        if name not in index:
+            return None
+        path = self.path_for(name)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            self._size -= index.pop(name)
+            return None
+        index.move_to_end(name)
+        return path
+
+    def _temp_path(self, name: str) -> Tuple[str, str]:
+        dest = self.path_for(name)
+        os.makedirs(self.root, exist_ok=True)
+        return dest, f"{dest}.{threading.get_ident()}.tmp"
+
+    def _commit(self, name: str, tmp: str, dest: str) -> str:
+        os.replace(tmp, dest)
+        size = os.path.getsize(dest)
+
+        with self._lock:
+            index = self._load_index()
+            self._size -= index.pop(name, 0)
+            index[name] = size
+            self._size += size
+            self._evict()
+        return dest
+
+    def _load_index(self) -> "OrderedDict[str, int]":
+        if self._index is None:
+            entries = []
+            if os.path.isdir(self.root):
+                with os.scandir(self.root) as it:
+                    for entry in it:
+                        if entry.is_file() and not entry.name.endswith(".tmp"):
+                            stat = entry.stat()
+                            entries.append((stat.st_mtime, entry.name, stat.st_size))
+            entries.sort()
+            self._index = OrderedDict((name, size) for _, name, size in entries)
+            self._size = sum(size for _, _, size in entries)
+        return self._index
+
+    def _evict(self) -> None:
+        assert self._index is not None
+        while self._size > self.max_bytes and len(self._index) > 1:
+            name, size = self._index.popitem(last=False)
+            self._size -= size
+            try:
+                os.remove(self.path_for(name))
+            except FileNotFoundError:
+                pass
+            logging.info(f"Evicted {name} from cache {self.root}")
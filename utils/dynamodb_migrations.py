@@ -0,0 +1,185 @@
+"""
+Table and index definitions for the feed and sync-state tables, plus a backfill for existing rows.
+
+    python -m utils.dynamodb_migrations --create     # new environments (both tables)
+    python -m utils.dynamodb_migrations --indexes    # add missing GSIs to an existing table
+    python -m utils.dynamodb_migrations --backfill   # tag existing rows for the new indexes
+    python -m utils.dynamodb_migrations --state      # add the sync-state table to an existing environment
+"""
+import argparse
+import asyncio
+import logging
+import os
+from typing import Any, Dict, List, Set
+
+from clients.dynamodb_client import DynamoDBClient, PENDING_FLAG
+
+logging.basicConfig(level=logging.INFO)
+
+
+def index_definitions(client: DynamoDBClient) -> List[Dict[str, Any]]:
+    return [
+        {
+            # Sparse: only rows carrying ``pending`` are indexed
+            "IndexName": client.pending_index,
+            "KeySchema": [{"AttributeName": "pending", "KeyType": "HASH"}],
+            "Projection": {"ProjectionType": "ALL"},
+        },
+        {
+            "IndexName": client.date_index,
+            "KeySchema": [
+                {"AttributeName": "feed_date", "KeyType": "HASH"},
+                {"AttributeName": "last_query_datetime", "KeyType": "RANGE"},
+            ],
+            "Projection": {"ProjectionType": "ALL"},
+        },
+    ]
+
+
+ATTRIBUTE_DEFINITIONS = [
+    {"AttributeName": "uuid", "AttributeType": "S"},
+    {"AttributeName": "pending", "AttributeType": "S"},
+    {"AttributeName": "feed_date", "AttributeType": "S"},
+    {"AttributeName": "last_query_datetime", "AttributeType": "S"},
+]
+
+
+def _provisioned_throughput() -> Dict[str, int]:
+    return {
+        "ReadCapacityUnits": int(os.environ.get("DYNAMODB_READ_CAPACITY_UNITS", "5")),
+        "WriteCapacityUnits": int(os.environ.get("DYNAMODB_WRITE_CAPACITY_UNITS", "5")),
+    }
+
+
+async def create_table(client: DynamoDBClient) -> None:
+    ddb = await client.client("dynamodb")
+    await ddb.create_table(
+        TableName=client.table_name,
+        KeySchema=[{"AttributeName": "uuid", "KeyType": "HASH"}],
+        AttributeDefinitions=ATTRIBUTE_DEFINITIONS,
+        GlobalSecondaryIndexes=index_definitions(client),
+        BillingMode="PAY_PER_REQUEST",
+    )
+    await ddb.get_waiter("table_exists").wait(TableName=client.table_name)
+    logging.info(f"Created table {client.table_name}")
+
+
+async def create_state_table(client: DynamoDBClient) -> None:
+    """Key/value table for watermarks; a handful of tiny items, so on-demand billing."""
+    ddb = await client.client("dynamodb")
+    try:
+        await ddb.describe_table(TableName=client.state_table_name)
+        logging.info(f"Table {client.state_table_name} already exists")
+        return
+    except ddb.exceptions.ResourceNotFoundException:
+        pass
+    await ddb.create_table(
+        TableName=client.state_table_name,
+        KeySchema=[{"AttributeName": "id", "KeyType": "HASH"}],
+        AttributeDefinitions=[{"AttributeName": "id", "AttributeType": "S"}],
+        BillingMode="PAY_PER_REQUEST",
+    )
+    await ddb.get_waiter("table_exists").wait(TableName=client.state_table_name)
+    logging.info(f"Created table {client.state_table_name}")
+
+
+async def ensure_indexes(client: DynamoDBClient) -> None:
+    """Create any missing GSI. DynamoDB only builds one GSI per UpdateTable call."""
+    ddb = await client.client("dynamodb")
+    for index in index_definitions(client):
+        table = (await ddb.describe_table(TableName=client.table_name))["Table"]
+        existing = {gsi["IndexName"] for gsi in table.get("GlobalSecondaryIndexes", [])}
+        if index["IndexName"] in existing:
+            continue
+
+        create = dict(index)
+        if table.get("BillingModeSummary", {}).get("BillingMode", "PROVISIONED") == "PROVISIONED":
+            create["ProvisionedThroughput"] = _provisioned_throughput()
+        used = {key["AttributeName"] for key in index["KeySchema"]}
+        await ddb.update_table(
+            TableName=client.table_name,
+            AttributeDefinitions=[a for a in ATTRIBUTE_DEFINITIONS if a["AttributeName"] in used],
+            GlobalSecondaryIndexUpdates=[{"Create": create}],
+        )
+        logging.info(f"Creating index {index['IndexName']}")
+        await _wait_for_index(ddb, client.table_name, index["IndexName"])
+
+
+async def _wait_for_index(ddb: Any, table_name: str, index_name: str) -> None:
+    while True:
+        table = (await ddb.describe_table(TableName=table_name))["Table"]
+        status = next(
+            (gsi["IndexStatus"] for gsi in table.get("GlobalSecondaryIndexes", []) if gsi["IndexName"] == index_name),
+            None,
+        )
+        if status == "ACTIVE":
+            logging.info(f"Index {index_name} is active")
+            return
+        await asyncio.sleep(10)
+
+
+async def backfill(client: DynamoDBClient, concurrency: int = 16) -> int:
+    """Set ``pending``/``feed_date`` on rows written before the indexes existed."""
+    table = await client.table()
+    semaphore = asyncio.Semaphore(concurrency)
+    updated = 0
+
+    async def tag(row: Dict[str, Any]) -> None:
+        nonlocal updated
+        sets, values = [], {}
+        if not row.get("s3_url") and row.get("pending") != PENDING_FLAG:
+            sets.append("pending = :pending")
+            values[":pending"] = PENDING_FLAG
+        if row.get("last_query_datetime") and not row.get("feed_date"):
+            sets.append("feed_date = :feed_date")
+            values[":feed_date"] = row["last_query_datetime"][:10]
+        if not sets:
+            return
+        async with semaphore:
+            try:
+                await table.update_item(
+                    Key={"uuid": row["uuid"]},
+                    UpdateExpression="SET " + ", ".join(sets),
+                    ExpressionAttributeValues=values,
+                )
+                updated += 1
+            except Exception as e:
+                logging.error(f"Failed to backfill {row['uuid']}: {e}")
+
+    in_flight: Set[asyncio.Task] = set()
+    async for row in client.scan_iter(
+        raw=True, projection=["uuid", "s3_url", "pending", "feed_date", "last_query_datetime"]
+    ):
+        task = asyncio.create_task(tag(row))
+        in_flight.add(task)
+        task.add_done_callback(in_flight.discard)
+        if len(in_flight) >= concurrency * 4:
+            await asyncio.wait(set(in_flight), return_when=asyncio.FIRST_COMPLETED)
+    await asyncio.gather(*in_flight)
+
+    logging.info(f"Backfilled {updated} rows in {client.table_name}")
+    return updated
+
+
+async def main(args: argparse.Namespace) -> None:
+    client = DynamoDBClient()
+    try:
+        if args.create:
+            await create_table(client)
+        if args.create or args.state:
+            await create_state_table(client)
+        if args.indexes:
+            await ensure_indexes(client)
+        if args.backfill:
+            await backfill(client)
+    finally:
+        await client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--create", action="store_true", help="create the table with all indexes")
+    parser.add_argument("--indexes", action="store_true", help="add missing indexes to an existing table")
+    parser.add_argument("--backfill", action="store_true", help="tag existing rows for the indexes")
+    parser.add_argument("--state", action="store_true", help="create the sync-state table if missing")
+    asyncio.run(main(parser.parse_args()))
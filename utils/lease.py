@@ -0,0 +1,43 @@
+import os
+import socket
+import time
+import uuid
+from typing import Optional
+
+
+def process_owner() -> str:
+    """
+    Identity of this process for ownership records: ``host:pid:token``.
+
+    Informational only: hostnames and pids repeat across container
+    restarts, so whether an owner is still alive is decided by its lease
+    (``lease_current``), never by looking the pid up.
+    """
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def lease_expiry(lease_seconds: float) -> float:
+    """Expiry timestamp for a lease taken or renewed now."""
+    return time.time() + lease_seconds
+
+
+def lease_current(expires_at: Optional[float], now: Optional[float] = None) -> bool:
+    """Whether a lease expiring at ``expires_at`` is still held; a missing lease is not."""
+    return expires_at is not None and expires_at > (time.time() if now is None else now)
+
+
+def write_lease(path: str, lease_seconds: float) -> None:
+    """Take or renew a lease kept in a file (blocking)."""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(repr(lease_expiry(lease_seconds)))
+    os.replace(tmp, path)
+
+
+def read_lease(path: str) -> Optional[float]:
+    """Expiry stored by ``write_lease``, or None when there is no readable lease (blocking)."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return float(f.read())
+    except (FileNotFoundError, ValueError):
+        return None
@@ -0,0 +1,151 @@
+"""
+Prometheus metrics for the pipeline and its clients, served at ``/metrics``.
+
+Updates are in-process counter/bucket increments (no I/O on the request
+path). Under gunicorn, ``PROMETHEUS_MULTIPROC_DIR`` is set by
+gunicorn_conf.py before the app is imported, and every worker's values are
+merged at scrape time.
+"""
+import os
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator, Tuple
+
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+from prometheus_client import REGISTRY, multiprocess
+
+STAGE_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+CALL_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+# ----------------------------------------------------------------------
+# Podcast pipeline
+# ----------------------------------------------------------------------
+STAGE_SECONDS = Histogram(
+    "reyy_podcast_stage_seconds", "Time spent in each podcast pipeline stage", ["stage"],
+    buckets=STAGE_BUCKETS,
+)
+STAGE_WAIT_SECONDS = Histogram(
+    "reyy_podcast_stage_wait_seconds", "Time items waited for a stage slot", ["stage"],
+    buckets=STAGE_BUCKETS,
+)
+STAGE_WAITING = Gauge(
+    "reyy_podcast_stage_waiting", "Items queued for a stage slot", ["stage"],
+    multiprocess_mode="livesum",
+)
+STAGE_IN_PROGRESS = Gauge(
+    "reyy_podcast_stage_in_progress", "Items currently in each stage", ["stage"],
+    multiprocess_mode="livesum",
+)
+ITEMS_IN_FLIGHT = Gauge(
+    "reyy_podcast_items_in_flight", "Podcast items being processed", multiprocess_mode="livesum",
+)
+ITEMS_PROCESSED = Counter(
+    "reyy_podcast_items", "Podcast items finished, by outcome", ["status"],
+)
+TTS_QUEUE_DEPTH = Gauge(
+    "reyy_tts_queue_depth", "Transcripts waiting for a TTS slot", ["model"],
+    multiprocess_mode="livesum",
+)
+
+IMAGE_LOOKUPS = Counter(
+    "reyy_image_cache_lookups", "Podcast input images by cache outcome (hit, miss, error)", ["result"],
+)
+IMAGE_BYTES = Counter(
+    "reyy_image_bytes", "Image bytes downloaded and stored after downscaling", ["kind"],
+)
+
+# ----------------------------------------------------------------------
+# Feed read API
+# ----------------------------------------------------------------------
+FEED_CACHE_LOOKUPS = Counter(
+    "reyy_feed_cache_lookups", "GET /feed pages by cache outcome (hit, miss, not_modified)", ["result"],
+)
+FEED_CACHE_INVALIDATIONS = Counter(
+    "reyy_feed_cache_invalidations", "Feed page cache flushes after writes",
+)
+
+# ----------------------------------------------------------------------
+# Ingestion scheduler
+# ----------------------------------------------------------------------
+INGEST_RUNS = Counter(
+    "reyy_ingest_runs", "Scheduled feed syncs, by topic and outcome", ["topic", "status"],
+)
+INGEST_ITEMS = Counter(
+    "reyy_ingest_items", "Feed items saved by scheduled syncs", ["topic"],
+)
+INGEST_LEADER = Gauge(
+    "reyy_ingest_leader", "1 while this process holds the ingestion lease", multiprocess_mode="livesum",
+)
+INGEST_DEFERRED = Counter(
+    "reyy_ingest_generation_deferred", "Generation rounds postponed because the podcast backlog was full",
+)
+
+# ----------------------------------------------------------------------
+# Outbound calls (DynamoDB, S3, Gemini, Perplexity)
+# ----------------------------------------------------------------------
+CALL_SECONDS = Histogram(
+    "reyy_client_call_seconds", "Latency of outbound client calls, retries included",
+    ["client", "operation"], buckets=CALL_BUCKETS,
+)
+CALL_ERRORS = Counter(
+    "reyy_client_call_errors", "Outbound client calls that failed", ["client", "operation"],
+)
+
+
+@contextmanager
+def time_call(client: str, operation: str) -> Iterator[None]:
+    """Record the latency of the enclosed call, and count it as an error if it raises."""
+    started = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        CALL_ERRORS.labels(client, operation).inc()
+        raise
+    finally:
+        CALL_SECONDS.labels(client, operation).observe(time.perf_counter() - started)
+
+
+_STARTED = "reyy_metrics_started"
+
+
+def instrument_botocore(client: Any, name: str) -> None:
+    """
+    Time every API call made through a botocore/aiobotocore client.
+
+    Hooks botocore's before-call / after-call / after-call-error events, so
+    each operation (PutItem, BatchWriteItem, UploadPart, ...) is recorded
+    without wrapping the call sites.
+    """
+
+    def before_call(model: Any, context: dict, **_: Any) -> None:
+        context[_STARTED] = time.perf_counter()
+
+    def after_call(model: Any, context: dict, http_response: Any = None, **_: Any) -> None:
+        started = context.pop(_STARTED, None)
+        if started is None:
+            return
+        CALL_SECONDS.labels(name, model.name).observe(time.perf_counter() - started)
+        if http_response is not None and http_response.status_code >= 400:
+            CALL_ERRORS.labels(name, model.name).inc()
+
+    def after_call_error(context: dict, event_name: str = "", **_: Any) -> None:
+        started = context.pop(_STARTED, None)
+        if started is None:
+            return
+        operation = event_name.rsplit(".", 1)[-1]
+        CALL_SECONDS.labels(name, operation).observe(time.perf_counter() - started)
+        CALL_ERRORS.labels(name, operation).inc()
+
+    events = client.meta.events
+    events.register("before-call", before_call)
+    events.register("after-call", after_call)
+    events.register("after-call-error", after_call_error)
+
+
+def render() -> Tuple[bytes, str]:
+    """Current metrics in the Prometheus text format, with their content type."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
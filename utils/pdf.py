@@ -1,31 +1,121 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from typing import AsyncIterator, Optional
+
 from models.perplexity import PerplexityFeedItem
+from utils.text import normalize_text
 
-from fpdf import FPDF
+# First existing font wins; PDF_FONT_PATH overrides. fonts-liberation ships in the Docker image.
+FONT_CANDIDATES = (
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+    "/usr/share/fonts/truetype/liberation/LiberationSans-Regular.ttf",
+)
 
-def save_item_as_pdf(item: PerplexityFeedItem, pdf_path: str) -> None:
+
+@lru_cache(maxsize=1)
+def unicode_font_path() -> Optional[str]:
+    """Path of a Unicode TTF font to embed, or None to fall back to core fonts."""
+    for path in (os.environ.get("PDF_FONT_PATH"), *FONT_CANDIDATES):
+        if path and os.path.isfile(path):
+            return path
+    return None
+
+
+def _new_document():
     """
-    Convert the item to PDF and save it at the specified path.
+    Fresh document with the Unicode font registered.
+
+    fpdf subsets a font in place when it writes the document, so documents
+    can't share parsed fonts; each render builds its own.
     """
-    
-    # Create PDF with Unicode support
+    from fpdf import FPDF
+
     pdf = FPDF()
+    font_path = unicode_font_path()
+    if font_path:
+        pdf.add_font("Body", fname=font_path)
+    return pdf
+
+
+def render_pdf(title: str, body: str) -> bytes:
+    """Render a title + body document and return the PDF bytes."""
+    pdf = _new_document()
     pdf.add_page()
-    
-    pdf.set_font("Arial", size=12)
-    pdf.cell(200, 10, txt=clean_text(item.title), ln=True, align='C')
+
+    if unicode_font_path():
+        pdf.set_font("Body", size=12)
+    else:
+        # Core fonts only cover Latin-1
+        pdf.set_font("Helvetica", size=12)
+        title, body = clean_text(title), clean_text(body)
+
+    pdf.cell(200, 10, text=title, new_x="LMARGIN", new_y="NEXT", align='C')
     pdf.ln(10)
-    pdf.multi_cell(0, 10, txt=clean_text(item.bullet_summary_preload))
-    
-    pdf.output(pdf_path)
-
-    # Clean text to handle any problematic characters
-def clean_text(text):
-    if not text:
-        return ""
-    # Replace problematic Unicode characters with ASCII equivalents
-    return (text.replace('\u2014', '-')  # em dash
-                .replace('\u2013', '-')   # en dash
-                .replace('\u2018', "'")   # left single quote
-                .replace('\u2019', "'")   # right single quote
-                .replace('\u201c', '"')   # left double quote
-                .replace('\u201d', '"'))  # right double quote
\ No newline at end of file
+    pdf.multi_cell(0, 10, text=body)
+    return bytes(pdf.output())
+
+
+def render_item_pdf(item: PerplexityFeedItem) -> bytes:
+    return render_pdf(item.title or "", item.bullet_summary_preload or "")
+
+
+def save_item_as_pdf(item: PerplexityFeedItem, pdf_path: str) -> None:
+    """
+    Convert the item to PDF and save it at the specified path.
+    """
+    with open(pdf_path, "wb") as f:
+        f.write(render_item_pdf(item))
+
+
+class PdfRenderer:
+    """
+    Renders PDFs off the event loop.
+
+    Rendering is CPU-bound pure Python, so by default it runs in a small
+    process pool (``PDF_RENDER_WORKERS``); ``PDF_RENDER_EXECUTOR=thread``
+    switches to threads where extra processes are undesirable.
+    """
+
+    def __init__(self) -> None:
+        workers = int(os.environ.get("PDF_RENDER_WORKERS", "2"))
+        self._executor: Executor
+        if os.environ.get("PDF_RENDER_EXECUTOR", "process") == "thread":
+            self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pdf")
+        else:
+            # Spawn, not fork: the parent runs grpc/aiohttp threads that don't survive a fork
+            self._executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+    async def render(self, item: PerplexityFeedItem) -> bytes:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, render_pdf, item.title or "", item.bullet_summary_preload or ""
+        )
+
+    async def render_to_file(self, item: PerplexityFeedItem, pdf_path: str) -> str:
+        data = await self.render(item)
+        await asyncio.to_thread(self._write, pdf_path, data)
+        return pdf_path
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    @classmethod
+    async def lifecycle(cls) -> AsyncIterator["PdfRenderer"]:
+        """Async generator for ``providers.Resource``."""
+        renderer = cls()
+        try:
+            yield renderer
+        finally:
+            renderer.close()
+
+    @staticmethod
+    def _write(path: str, data: bytes) -> None:
+        with open(path, "wb") as f:
+            f.write(data)
+
+def clean_text(text: Optional[str]) -> str:
+    """Make ``text`` safe for FPDF's Latin-1 core fonts."""
+    return normalize_text(text, encoding="latin-1")
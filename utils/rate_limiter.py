@@ -0,0 +1,51 @@
+import asyncio
+import random
+import time
+
+
+async def backoff(attempt: int, base: float = 0.05, cap: float = 5.0) -> None:
+    """Sleep with full-jitter exponential backoff before retry number ``attempt``."""
+    await asyncio.sleep(random.uniform(0, min(cap, base * (2 ** attempt))))
+
+
+class TokenBucket:
+    """
+    Async token bucket: ``rate`` tokens refill every ``per`` seconds, up to ``capacity``.
+
+    Waiters are served in arrival order; ``acquire`` sleeps just long enough
+    for the requested tokens to refill. A request for more than ``capacity``
+    is taken in capacity-sized installments, so it is charged in full.
+    """
+
+    def __init__(self, rate: float, capacity: float, per: float = 60.0) -> None:
+        self.rate = rate / per
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, tokens: float = 1.0) -> None:
+        async with self._lock:
+            while tokens > 0:
+                installment = min(tokens, self.capacity)
+                self._refill()
+                if self._tokens >= installment:
+                    self._tokens -= installment
+                    tokens -= installment
+                    continue
+                await asyncio.sleep((installment - self._tokens) / self.rate)
+
+    def adjust(self, tokens: float) -> None:
+        """
+        Charge (positive) or refund (negative) ``tokens`` after the fact.
+
+        Used when the real cost is only known from the response; the balance
+        may go negative, which delays later ``acquire`` calls accordingly.
+        """
+        self._refill()
+        self._tokens = min(self.capacity, self._tokens - tokens)
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
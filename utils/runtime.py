@@ -0,0 +1,25 @@
+import os
+from typing import Optional
+
+_configured = False
+
+
+def configure_runtime(env_file: Optional[str] = None) -> None:
+    """
+    Process start-up hook: load ``.env`` and set environment defaults.
+
+    Must run before the clients are built (they read settings in
+    ``__init__``) and before grpc is first imported. Safe to call more than
+    once; only the first call does anything.
+    """
+    global _configured
+    if _configured:
+        return
+    from dotenv import load_dotenv
+
+    load_dotenv(env_file)
+    # grpc (pulled in by the Google LLM/TTS stacks) reads these on import;
+    # fork support keeps it usable in pre-forked server and pool workers.
+    os.environ.setdefault("GRPC_ENABLE_FORK_SUPPORT", "true")
+    os.environ.setdefault("GRPC_POLL_STRATEGY", "poll")
+    _configured = True
@@ -0,0 +1,21 @@
+import os
+
+from uvicorn.workers import UvicornWorker as BaseUvicornWorker
+
+
+class UvicornWorker(BaseUvicornWorker):
+    """
+    Gunicorn worker that serves the app with uvicorn.
+
+    ``UVICORN_LOOP`` / ``UVICORN_HTTP`` select the event loop and HTTP parser;
+    the default "auto" picks uvloop and httptools when installed
+    (``uvicorn[standard]``) and falls back to asyncio/h11 otherwise.
+    """
+
+    CONFIG_KWARGS = {
+        **BaseUvicornWorker.CONFIG_KWARGS,
+        "loop": os.environ.get("UVICORN_LOOP", "auto"),
+        "http": os.environ.get("UVICORN_HTTP", "auto"),
+        # Fail the worker instead of serving without drain/shutdown hooks
+        "lifespan": "on",
+    }
@@ -0,0 +1,77 @@
+import contextvars
+import functools
+import inspect
+import os
+import random
+from typing import Any, Callable, Optional, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# Set by the outermost traced call so a whole trace is kept or dropped together
+_sampled: contextvars.ContextVar[Optional[bool]] = contextvars.ContextVar("langsmith_sampled", default=None)
+
+
+def tracing_enabled() -> bool:
+    return any(
+        os.environ.get(var, "").lower() == "true"
+        for var in ("LANGSMITH_TRACING", "LANGCHAIN_TRACING_V2")
+    )
+
+
+def sampling_rate() -> float:
+    return float(os.environ.get("LANGSMITH_TRACING_SAMPLING_RATE", "1.0"))
+
+
+def traceable(name: Optional[str] = None, **kwargs: Any) -> Callable[[F], F]:
+    """
+    Drop-in for ``langsmith.traceable`` that samples whole traces.
+
+    The root call decides once, with probability
+    ``LANGSMITH_TRACING_SAMPLING_RATE``, and nested calls (including tasks
+    spawned under it) follow that decision. Unsampled calls run the plain
+    function: no run tree, no exporter, and langsmith isn't imported at all
+    while tracing is off.
+    """
+
+    def decorator(fn: F) -> F:
+        traced: Optional[Callable[..., Any]] = None
+
+        def traced_fn() -> Callable[..., Any]:
+            nonlocal traced
+            if traced is None:
+                import langsmith
+
+                traced = langsmith.traceable(name=name, **kwargs)(fn)
+            return traced
+
+        def decide() -> Optional[contextvars.Token]:
+            if _sampled.get() is not None:
+                return None
+            return _sampled.set(tracing_enabled() and random.random() < sampling_rate())
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args: Any, **kw: Any) -> Any:
+                token = decide()
+                try:
+                    target = traced_fn() if _sampled.get() else fn
+                    return await target(*args, **kw)
+                finally:
+                    if token is not None:
+                        _sampled.reset(token)
+
+            return async_wrapper  # type: ignore[return-value]
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kw: Any) -> Any:
+            token = decide()
+            try:
+                target = traced_fn() if _sampled.get() else fn
+                return target(*args, **kw)
+            finally:
+                if token is not None:
+                    _sampled.reset(token)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
@@ -0,0 +1,271 @@
+import asyncio
+import logging
+import os
+import tempfile
+import time
+import uuid
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Optional, Set, Tuple
+
+from utils.lease import lease_current, process_owner, read_lease, write_lease
+
+# Tmpfs keeps scratch I/O off the disk, but Docker's default /dev/shm is only
+# 64MB, so it has to be asked for (WORKSPACE_TMPFS=true) rather than assumed.
+TMPFS_ROOT = "/dev/shm"
+
+# Each owner directory holds its process's lease
+LEASE_FILE = ".lease"
+
+
+def remove_tree(path: str) -> int:
+    """Delete ``path`` (file or directory tree) with ``os.scandir`` and return the bytes freed."""
+    try:
+        it = os.scandir(path)
+    except FileNotFoundError:
+        return 0
+    except NotADirectoryError:
+        try:
+            size = os.lstat(path).st_size
+            os.unlink(path)
+            return size
+        except FileNotFoundError:
+            return 0
+
+    freed = 0
+    with it:
+        for entry in it:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    freed += remove_tree(entry.path)
+                else:
+                    size = entry.stat(follow_symlinks=False).st_size
+                    os.unlink(entry.path)
+                    freed += size
+            except FileNotFoundError:
+                pass
+    try:
+        os.rmdir(path)
+    except FileNotFoundError:
+        pass
+    return freed
+
+
+def tree_stats(path: str) -> Tuple[int, float]:
+    """Return (total bytes, newest mtime) for everything under ``path``."""
+    total, newest = 0, 0.0
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        size, mtime = tree_stats(entry.path)
+                    else:
+                        stat = entry.stat(follow_symlinks=False)
+                        size, mtime = stat.st_size, stat.st_mtime
+                except FileNotFoundError:
+                    continue
+                total += size
+                newest = max(newest, mtime)
+        newest = max(newest, os.stat(path).st_mtime)
+    except FileNotFoundError:
+        pass
+    return total, newest
+
+
+class Workspace:
+    """
+    Scratch directory owned by one unit of work.
+
+    Paths handed out by ``file``/``dir`` and anything passed to ``track`` are
+    the only things ``cleanup`` removes, so a workspace never touches files
+    belonging to another run.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._artifacts: List[str] = []
+
+    def file(self, name: str) -> str:
+        """Path for a file inside the workspace."""
+        return self.track(os.path.join(self.path, name))
+
+    def dir(self, name: str) -> str:
+        """Create and return a subdirectory of the workspace."""
+        path = os.path.join(self.path, name)
+        os.makedirs(path, exist_ok=True)
+        return self.track(path)
+
+    def track(self, path: str) -> str:
+        """Record an artifact (possibly outside the workspace) to remove on cleanup."""
+        self._artifacts.append(path)
+        return path
+
+    @property
+    def artifacts(self) -> List[str]:
+        return list(self._artifacts)
+
+    def cleanup(self) -> int:
+        """Remove tracked artifacts and the workspace itself; returns bytes freed."""
+        freed = sum(remove_tree(path) for path in reversed(self._artifacts))
+        self._artifacts.clear()
+        return freed + remove_tree(self.path)
+
+
+class WorkspaceManager:
+    """
+    Hands out per-job workspaces under one root and keeps that root bounded.
+
+    Each process writes under ``<root>/<host:pid:token>/`` and renews a
+    lease file there on every janitor pass. A background janitor removes
+    directories whose lease has lapsed, workspaces nothing has written to
+    for ``max_age_seconds``, and - oldest first - this process's inactive
+    workspaces while the root is over ``max_bytes``.
+    """
+
+    def __init__(self, root: Optional[str] = None) -> None:
+        self.root = root or os.environ.get('WORKSPACE_ROOT') or self._default_root()
+        self.max_age_seconds = float(os.environ.get('WORKSPACE_MAX_AGE_HOURS', '6')) * 3600
+        self.max_bytes = int(float(os.environ.get('WORKSPACE_MAX_MB', '2048')) * 1024 * 1024)
+        self.janitor_interval = float(os.environ.get('WORKSPACE_JANITOR_INTERVAL_SECONDS', '300'))
+        # Renewed every janitor pass, so a couple of slow passes don't let it lapse
+        self.lease_seconds = 3 * self.janitor_interval
+
+        self.owner = process_owner()
+        self.owner_dir = os.path.join(self.root, self.owner)
+        self._active: Set[str] = set()
+        self._janitor: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _default_root() -> str:
+        tmpfs = os.environ.get('WORKSPACE_TMPFS', 'false').lower() == 'true'
+        base = TMPFS_ROOT if tmpfs and os.access(TMPFS_ROOT, os.W_OK) else tempfile.gettempdir()
+        return os.path.join(base, "reyy-ai")
+
+    async def start(self) -> None:
+        await asyncio.to_thread(self.renew_lease)
+        # Sweep right away so a crash before this start doesn't wait an interval
+        await asyncio.to_thread(self.sweep)
+        self._janitor = asyncio.create_task(self._run_janitor(), name="workspace-janitor")
+
+    async def close(self) -> None:
+        if self._janitor:
+            self._janitor.cancel()
+            try:
+                await self._janitor
+            except asyncio.CancelledError:
+                pass
+            self._janitor = None
+        await asyncio.to_thread(remove_tree, self.owner_dir)
+
+    @classmethod
+    async def lifecycle(cls) -> AsyncIterator["WorkspaceManager"]:
+        """Async generator for ``providers.Resource``."""
+        manager = cls()
+        await manager.start()
+        try:
+            yield manager
+        finally:
+            await manager.close()
+
+    # ------------------------------------------------------------------
+    # Workspaces
+    # ------------------------------------------------------------------
+    def create(self, *labels: str) -> Workspace:
+        """Create a fresh, uniquely named workspace (blocking)."""
+        name = "-".join([*(label for label in labels if label), uuid.uuid4().hex[:12]])
+        workspace = Workspace(os.path.join(self.owner_dir, name))
+        # Marked live before it exists so a concurrent sweep can't evict it
+        self._active.add(workspace.path)
+        try:
+            os.makedirs(workspace.path)
+        except OSError:
+            self._active.discard(workspace.path)
+            raise
+        return workspace
+
+    def release(self, workspace: Workspace) -> int:
+        """Clean up ``workspace`` and stop treating it as live (blocking)."""
+        try:
+            return workspace.cleanup()
+        finally:
+            self._active.discard(workspace.path)
+
+    @asynccontextmanager
+    async def workspace(self, *labels: str) -> AsyncIterator[Workspace]:
+        """Workspace for the duration of the block, removed afterwards."""
+        workspace = await asyncio.to_thread(self.create, *labels)
+        try:
+            yield workspace
+        finally:
+            await asyncio.to_thread(self.release, workspace)
+
+    # ------------------------------------------------------------------
+    # Janitor
+    # ------------------------------------------------------------------
+    async def _run_janitor(self) -> None:
+        while True:
+            await asyncio.sleep(self.janitor_interval)
+            try:
+                await asyncio.to_thread(self.renew_lease)
+                await asyncio.to_thread(self.sweep)
+            except Exception as e:
+                logging.error(f"Workspace sweep failed: {e}")
+
+    def renew_lease(self) -> None:
+        """Mark this process's workspaces as live for another ``lease_seconds`` (blocking)."""
+        os.makedirs(self.owner_dir, exist_ok=True)
+        write_lease(os.path.join(self.owner_dir, LEASE_FILE), self.lease_seconds)
+
+    def sweep(self) -> int:
+        """Remove orphaned, stale and over-quota workspaces; returns bytes freed (blocking)."""
+        if not os.path.isdir(self.root):
+            return 0
+
+        freed = 0
+        candidates: List[Tuple[float, int, str]] = []  # (newest mtime, bytes, path)
+        total = 0
+        now = time.time()
+        with os.scandir(self.root) as owners:
+            owner_dirs = [entry for entry in owners if entry.is_dir(follow_symlinks=False)]
+
+        for owner in owner_dirs:
+            if not self._owner_alive(owner):
+                freed += remove_tree(owner.path)
+                logging.info(f"Removed workspaces of exited process: {owner.path}")
+                continue
+            try:
+                with os.scandir(owner.path) as it:
+                    workspaces = [entry.path for entry in it if entry.is_dir(follow_symlinks=False)]
+            except FileNotFoundError:
+                continue
+            for path in workspaces:
+                size, newest = tree_stats(path)
+                total += size
+                if path in self._active:
+                    continue
+                if now - newest > self.max_age_seconds:
+                    freed += remove_tree(path)
+                    total -= size
+                    logging.info(f"Removed stale workspace: {path}")
+                elif owner.name == self.owner:
+                    # Another live process's workspaces may be in use; only ours are known idle
+                    candidates.append((newest, size, path))
+
+        # Over quota: drop the least recently touched inactive workspaces first
+        candidates.sort()
+        while total > self.max_bytes and candidates:
+            _, size, path = candidates.pop(0)
+            freed += remove_tree(path)
+            total -= size
+            logging.info(f"Removed workspace over quota: {path}")
+        if total > self.max_bytes:
+            logging.warning(f"Workspace root {self.root} holds {total} bytes of active work (quota {self.max_bytes})")
+        return freed
+
+    def _owner_alive(self, owner: os.DirEntry) -> bool:
+        if owner.name == self.owner:
+            return True
+        expires = read_lease(os.path.join(owner.path, LEASE_FILE))
+        if expires is None:
+            return True  # not ours to judge
+        return lease_current(expires)